@@ -4,24 +4,256 @@ Role: Query the graph to find patterns, consensus, contradictions using Google G
 Optimized for: Deep analysis with LLM-powered insights
 """
 from typing import List, Dict, Any, Set, Optional
-from collections import Counter, defaultdict
+from collections import Counter, OrderedDict, defaultdict
+from itertools import chain, islice
+import asyncio
+import hashlib
+import json
 import re
 import time
 import os
+import numpy as np
+import orjson
 from dotenv import load_dotenv
-import google.generativeai as genai
+from .cartographer import pub_view, GAP_LONG_TERM, GAP_HUMAN, GAP_ANIMAL, GAP_MECHANISM, GAP_ALL
 
 # Load environment variables
 load_dotenv()
 
-# Configure Google AI
+# Configure Google AI (the SDK is only imported when a key is present, since the fallback never uses it)
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
+genai = None
+_RETRYABLE_ERRORS = ()  # Nothing to retry without the SDK
 if GOOGLE_API_KEY:
+    import google.generativeai as genai
+    from google.api_core import exceptions as google_exceptions
+    
+    # Rate-limit and transient server errors worth retrying with backoff
+    _RETRYABLE_ERRORS = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.InternalServerError,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+    )
     genai.configure(api_key=GOOGLE_API_KEY)
     print(f"✅ Analyst: Google AI configured successfully")
 else:
     print("⚠️ WARNING: GOOGLE_API_KEY not found. Analyst will use fallback logic.")
 
+# Cap concurrent outbound Gemini calls so overlapping queries stay under the provider's RPM
+_GEMINI_SEM = asyncio.Semaphore(int(os.getenv("GEMINI_CONCURRENCY", "8")))
+GEMINI_MAX_RETRIES = 3
+
+# Semantic cache: paraphrased queries whose embeddings are this similar reuse the stored analysis
+EMBEDDING_MODEL = 'models/text-embedding-004'
+SEMANTIC_CACHE_THRESHOLD = 0.92
+
+# Static analyst instructions, sent as the model's system instruction so every request
+# shares an identical prefix and only the question and publications vary per call
+ANALYSIS_MODEL = 'gemini-2.0-flash'
+ANALYSIS_INSTRUCTIONS = """You are a scientific research analyst specializing in NASA Space Biology research.
+
+Analyze the research question based on the provided publications.
+Publications are listed one per line as id|year|title|abstract (abstracts are truncated; empty fields are unknown).
+
+Please provide:
+1. CONSENSUS: What are the main consistent findings across these publications? (2-3 sentences)
+2. CONTRADICTIONS: Are there any conflicting findings or disagreements? List them. If none, say "No major contradictions detected."
+3. KNOWLEDGE GAPS: What aspects of this question need more research? (2-3 specific gaps)
+4. CONFIDENCE LEVEL: Based on the number of relevant publications, rate as: High Confidence, Medium Confidence, or Low Confidence
+
+Format your response as JSON:
+{
+  "consensus": "...",
+  "contradictions": ["...", "..."] or [],
+  "knowledge_gaps": ["...", "...", "..."],
+  "confidence": "High Confidence" or "Medium Confidence" or "Low Confidence"
+}"""
+
+# Compact publication context sent to Gemini
+PUB_CONTEXT_HEADER = "id|year|title|abstract"
+PUB_CONTEXT_LIMIT = 10
+NEAR_DUPLICATE_JACCARD = 0.85
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# Queries scoring below this (concept count + publications, capped at 5) skip the LLM:
+# the rule-based fallback answers degenerate questions just as well without a round trip
+LLM_MIN_SIGNAL = 5
+LLM_SIGNAL_PUB_CAP = 5
+
+# Outermost JSON object in a model reply, tolerating markdown fences and trailing prose
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# Concept extraction: one alternation pattern whose named groups tell each match's category,
+# so a query is scanned once. Compiled at import time and shared by every AnalystAgent.
+# Queries are lowercased before matching, so the pattern is case-sensitive: with IGNORECASE,
+# case-folding variants such as "tiſſue" would match without having a _BIO_TERM_LABELS entry.
+BIO_TERMS = frozenset([
+    'gene', 'protein', 'cell', 'tissue', 'bone', 'muscle', 'cardiovascular', 'immune',
+    'metabolism', 'growth', 'photosynthesis', 'root', 'leaf', 'vision', 'retina'
+])
+_BIO_TERM_LABELS = {term: term.capitalize() for term in BIO_TERMS}  # Lowercase term -> display label
+_BIO_ALTERNATION = '|'.join(sorted(BIO_TERMS))
+# Biological terms match as word prefixes so plurals/derivations ("genes", "cellular") still count
+_CONCEPT_RE = re.compile(
+    r'(?P<subjects>\b(?:mice?|mouse|rodents?|human|plant|cell|arabidopsis|bacteria|yeast)\b)'
+    r'|(?P<stressors>\b(?:microgravity|radiation|space|weightless|cosmic|isolation|confinement)\b)'
+    rf'|(?P<biological>\b(?:{_BIO_ALTERNATION}))'
+)
+
+
+def _context_cell(value: Any, max_len: int) -> str:
+    """Flatten a field into one pipe-free table cell"""
+    return ' '.join(str(value or '')[:max_len].replace('|', '/').split())
+
+
+def _shingles(text: str, size: int = 5) -> Set[int]:
+    """Hashed word n-gram shingles used for near-duplicate detection"""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {hash(tuple(words))} if words else set()
+    return {hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+
+def _drop_near_duplicates(publications: List[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    """Keep up to `limit` publications, skipping ones whose abstract (or title) nearly repeats an earlier one"""
+    kept, kept_shingles = [], []
+    for pub in publications:
+        view = pub_view(pub)
+        shingles = _shingles(view.abstract or view.title)
+        if shingles and any(
+            len(shingles & seen) / len(shingles | seen) >= NEAR_DUPLICATE_JACCARD
+            for seen in kept_shingles
+        ):
+            continue
+        kept.append(pub)
+        kept_shingles.append(shingles)
+        if len(kept) >= limit:
+            break
+    return kept
+
+
+def _build_pub_context(publications: List[Dict[str, Any]]) -> str:
+    """Render publications as a compact id|year|title|abstract table"""
+    views = [pub_view(pub) for pub in _drop_near_duplicates(publications, PUB_CONTEXT_LIMIT)]
+    rows = [
+        f"{_context_cell(view.pmid, 20)}|{_context_cell(view.year or '', 4)}|"
+        f"{_context_cell(view.title, 120)}|{_context_cell(view.abstract, 280)}"
+        for view in views
+    ]
+    return PUB_CONTEXT_HEADER + "\n" + "\n".join(rows)
+
+
+def _parse_json_object(text: str) -> Dict[str, Any]:
+    """Extract and parse the JSON object embedded in an LLM response"""
+    match = _JSON_RE.search(text)
+    if not match:
+        raise ValueError("No JSON object found in AI response")
+    
+    payload = match.group(0)
+    try:
+        return orjson.loads(payload)
+    except orjson.JSONDecodeError:
+        # The stdlib parser accepts a few things orjson rejects (e.g. NaN)
+        return json.loads(payload)
+
+
+def _retry_after_seconds(error: Exception, attempt: int) -> float:
+    """Honor the server's retry-after header when present, else back off exponentially"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    retry_after = headers.get('retry-after') if hasattr(headers, 'get') else None
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return float(2 ** attempt)
+
+
+class _JsonObjectScanner:
+    """Track brace depth across streamed text to spot when the outermost JSON object closes"""
+    __slots__ = ('depth', 'started', 'in_string', 'escaped')
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """Consume a chunk; True once the first top-level object is complete"""
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif not self.started:
+                # Prose before the object (quotes included) is ignored
+                if char == '{':
+                    self.started = True
+                    self.depth = 1
+            elif char == '"':
+                self.in_string = True
+            elif char == '{':
+                self.depth += 1
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
+
+async def _stream_json_with_retry(model, prompt: str) -> str:
+    """
+    Stream a Gemini reply, bounded by the shared semaphore and retried on 429/5xx,
+    and stop reading as soon as the JSON object closes so trailing prose is never awaited
+    """
+    for attempt in range(GEMINI_MAX_RETRIES):
+        try:
+            async with _GEMINI_SEM:
+                buffer = []
+                scanner = _JsonObjectScanner()
+                response = await model.generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    try:
+                        text = chunk.text
+                    except ValueError:  # Chunk without text parts (e.g. finish metadata)
+                        continue
+                    buffer.append(text)
+                    if scanner.feed(text):
+                        break
+                return ''.join(buffer)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == GEMINI_MAX_RETRIES - 1:
+                raise
+            await asyncio.sleep(_retry_after_seconds(e, attempt))
+
+
+async def embed_texts(texts: List[str]) -> List[Optional[np.ndarray]]:
+    """
+    Embed texts in one request as unit vectors, bounded by the shared semaphore
+    (all None without Gemini or on error; None for a zero vector)
+    """
+    if not GOOGLE_API_KEY or not texts:
+        return [None] * len(texts)
+    
+    try:
+        async with _GEMINI_SEM:
+            response = await genai.embed_content_async(
+                model=EMBEDDING_MODEL,
+                content=texts,
+                task_type='semantic_similarity'
+            )
+        embeddings = np.asarray(response['embedding'], dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1)
+        return [row / norm if norm else None for row, norm in zip(embeddings, norms)]
+    except Exception as e:
+        print(f"⚠️ Embedding Error: {e}")
+        return [None] * len(texts)
+
 
 class AnalystAgent:
     """
@@ -45,94 +277,63 @@ class AnalystAgent:
         self.role = "Scientific Intelligence Specialist"
         self.cartographer = cartographer
         
+        # Gemini model built once and reused for every analysis (None -> rule-based fallback)
+        self._model = (
+            genai.GenerativeModel(ANALYSIS_MODEL, system_instruction=ANALYSIS_INSTRUCTIONS)
+            if GOOGLE_API_KEY else None
+        )
+        
         # Performance optimization caches
-        self.cached_analyses = {}  # Query hash -> analysis result
+        self.cached_analyses = OrderedDict()  # blake2b(normalized query) -> analysis result, LRU order
         self.max_cache_size = 100
-        self.concept_patterns = self._build_concept_patterns()
-    
-    def _build_concept_patterns(self) -> Dict[str, re.Pattern]:
-        """Pre-compile regex patterns for fast concept extraction"""
-        return {
-            'subjects': re.compile(
-                r'\b(mice?|mouse|rodents?|human|plant|cell|arabidopsis|bacteria|yeast)\b',
-                re.IGNORECASE
-            ),
-            'stressors': re.compile(
-                r'\b(microgravity|radiation|space|weightless|cosmic|isolation|confinement)\b',
-                re.IGNORECASE
-            ),
-            'biological': re.compile(
-                r'\b(gene|protein|cell|tissue|bone|muscle|cardiovascular|immune|metabolism|growth)\b',
-                re.IGNORECASE
-            )
-        }
         
+        # Semantic cache ring buffer: unit-norm query embeddings + their analyses
+        self._embedding_matrix = None  # Allocated on first insert, once the dimension is known
+        self._embedding_results = [None] * self.max_cache_size
+        self._embedding_count = 0
+        self._embedding_next = 0
+        self._llm_calls_skipped = 0  # Low-signal queries answered by the fallback
+        self._cache_lookups = 0  # analyze_query calls
+        self._exact_hits = 0
+        self._semantic_hits = 0
+    
     def log(self, message: str) -> str:
         """Format log message with agent identity"""
         return f"[{self.name}] {message}"
     
-    def analyze_query_with_ai(self, query: str, publications: List[Dict[str, Any]]) -> Dict[str, Any]:
+    async def analyze_query_with_ai(self, query: str, publications: List[Dict[str, Any]],
+                                    concepts: Optional[Dict[str, Set[str]]] = None) -> Dict[str, Any]:
         """
-        AI-Powered Analysis using Google Gemini
+        AI-Powered Analysis using Google Gemini (non-blocking)
         
         Args:
             query: User's research question
             publications: Relevant publications from the knowledge base
+            concepts: Concepts already extracted from the query, reused by the fallback
             
         Returns:
             Dictionary with AI-generated consensus, contradictions, gaps, and evidence
         """
-        if not GOOGLE_API_KEY:
-            return self.analyze_query_fallback(query, publications)
+        if self._model is None:
+            return self.analyze_query_fallback(query, publications, concepts)
         
         try:
-            # Prepare context from publications
-            pub_context = "\n\n".join([
-                f"Title: {pub.get('title', 'N/A')}\n"
-                f"Abstract: {pub.get('abstract', 'N/A')[:500]}...\n"
-                f"PMID: {pub.get('pmid', 'N/A')}"
-                for pub in publications[:10]  # Use top 10 most relevant
-            ])
-            
-            # Create AI prompt
-            prompt = f"""You are a scientific research analyst specializing in NASA Space Biology research. 
+            # Prepare compact context from the top (near-duplicate-free) publications
+            pub_context = _build_pub_context(publications)
             
-Analyze the following research question based on the provided publications:
+            # Only the per-query part; the static instructions travel as the system instruction
+            prompt = f"""QUESTION: {query}
 
-QUESTION: {query}
+RELEVANT PUBLICATIONS: {len(publications)}
 
 PUBLICATIONS:
-{pub_context}
+{pub_context}"""
 
-Please provide:
-1. CONSENSUS: What are the main consistent findings across these publications? (2-3 sentences)
-2. CONTRADICTIONS: Are there any conflicting findings or disagreements? List them. If none, say "No major contradictions detected."
-3. KNOWLEDGE GAPS: What aspects of this question need more research? (2-3 specific gaps)
-4. CONFIDENCE LEVEL: Based on {len(publications)} publications, rate as: High Confidence, Medium Confidence, or Low Confidence
-
-Format your response as JSON:
-{{
-  "consensus": "...",
-  "contradictions": ["...", "..."] or [],
-  "knowledge_gaps": ["...", "...", "..."],
-  "confidence": "High Confidence" or "Medium Confidence" or "Low Confidence"
-}}"""
-
-            # Call Gemini AI
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            response = model.generate_content(prompt)
+            # Call Gemini AI without blocking the event loop
+            response_text = await _stream_json_with_retry(self._model, prompt)
             
-            # Parse AI response
-            import json
-            response_text = response.text.strip()
-            
-            # Extract JSON from response (handle markdown code blocks)
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            ai_analysis = json.loads(response_text)
+            # Parse AI response (markdown code fences and surrounding prose are skipped)
+            ai_analysis = _parse_json_object(response_text)
             
             # Compile evidence from the actual publications found
             evidence = self.compile_evidence(publications[:15])  # Use more publications for evidence
@@ -149,14 +350,16 @@ Format your response as JSON:
             
         except Exception as e:
             print(f"⚠️ AI Analysis Error: {e}")
-            return self.analyze_query_fallback(query, publications)
+            return self.analyze_query_fallback(query, publications, concepts)
     
-    def analyze_query_fallback(self, query: str, publications: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Fallback to rule-based analysis if AI fails"""
-        concepts = self.extract_concepts(query)
+    def analyze_query_fallback(self, query: str, publications: List[Dict[str, Any]],
+                               concepts: Optional[Dict[str, Set[str]]] = None) -> Dict[str, Any]:
+        """Fallback to rule-based analysis if AI fails (reuses the caller's concepts when given)"""
+        if concepts is None:
+            concepts = self.extract_concepts(query)
         
         return {
-            'consensus': f"Based on {len(publications)} publications, research shows consistent patterns in {', '.join(list(concepts['all'])[:3])}.",
+            'consensus': f"Based on {len(publications)} publications, research shows consistent patterns in {', '.join(islice(concepts['all'], 3))}.",
             'contradictions': [],
             'knowledge_gaps': ['More research needed in this area.'],
             'evidence': self.compile_evidence(publications[:5]),
@@ -165,25 +368,51 @@ Format your response as JSON:
             'analysis_method': 'Rule-Based (Fallback)'
         }
     
-    def analyze_query(self, query: str) -> Dict[str, Any]:
+    async def analyze_query(self, query: str, query_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Main analysis method - now AI-powered!
         
         Args:
             query: User's research question
+            query_embedding: Unit-norm embedding of the query if already computed (e.g. by a batch)
             
         Returns:
             Dictionary with AI-generated consensus, contradictions, gaps, and evidence
         """
         start_time = time.time()
         
-        # Extract key concepts from query
-        concepts = self.extract_concepts(query)
+        # Lowercase the query once; the cache key and concept extraction both use it
+        query_lower = query.lower()
+        
+        # Exact-match cache: a repeated question skips all work
+        query_key = self._query_key(query_lower)
+        self._cache_lookups += 1
+        cached = self._get_cached_analysis(query_key)
+        if cached is not None:
+            self._exact_hits += 1
+            return cached
+        
+        # Start the embedding round trip first: concept extraction and graph retrieval don't
+        # depend on it, so they run while the request is in flight
+        embedding_task = None
+        if query_embedding is None and GOOGLE_API_KEY:
+            embedding_task = asyncio.create_task(self._embed_query(query))
+            await asyncio.sleep(0)  # Let the task issue its request before the local work
         
-        # Find relevant publications
-        publications = self.find_relevant_publications(concepts)
+        try:
+            # Extract key concepts from query
+            concepts = self.extract_concepts(query, query_lower)
+            
+            # Find relevant publications
+            publications = self.find_relevant_publications(concepts)
+        except BaseException:
+            if embedding_task is not None:
+                embedding_task.cancel()
+            raise
         
         if not publications:
+            if embedding_task is not None:
+                embedding_task.cancel()
             return {
                 'consensus': 'No relevant publications found for this query.',
                 'contradictions': [],
@@ -195,22 +424,157 @@ Format your response as JSON:
                 'analysis_method': 'No Data'
             }
         
-        # Use AI-powered analysis
-        result = self.analyze_query_with_ai(query, publications)
+        # Use AI-powered analysis only when the query carries enough signal to be worth a round trip
+        signal = len(concepts['all']) + min(len(publications), LLM_SIGNAL_PUB_CAP)
+        if signal < LLM_MIN_SIGNAL:
+            # Only LLM answers are cached, so the fallback never needs the embedding
+            if embedding_task is not None:
+                embedding_task.cancel()
+            self._llm_calls_skipped += 1
+            result = self.analyze_query_fallback(query, publications, concepts)
+        else:
+            # Semantic cache: a paraphrase of a recent question skips the LLM round trip
+            if embedding_task is not None:
+                query_embedding = await embedding_task
+            if query_embedding is not None:
+                cached = self._find_similar_analysis(query_embedding)
+                if cached is not None:
+                    self._semantic_hits += 1
+                    self._put_cached_analysis(query_key, cached)
+                    return cached
+            result = await self.analyze_query_with_ai(query, publications, concepts)
         
         # Add timing and concepts
         result['analysis_time_ms'] = round((time.time() - start_time) * 1000, 2)
         result['highlighted_concepts'] = list(concepts['all'])
         result['from_cache'] = False
         
+        # Only LLM answers are worth caching; the fallback is cheap to recompute
+        if result['analysis_method'] == 'AI-Powered (Gemini)':
+            self._remember_analysis(query_key, query_embedding, result)
+        
         return result
     
-    def extract_concepts(self, query: str) -> Dict[str, Set[str]]:
+    async def analyze_queries(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Analyze a batch of queries concurrently
+        
+        Repeated questions (after normalization) are analyzed once, and every query that
+        misses the exact-match cache is embedded in a single batched request instead of
+        one embedding round trip per query.
+        
+        Args:
+            queries: User research questions
+            
+        Returns:
+            One analysis per query, in input order
+        """
+        # Normalized key -> first query text with that key, in first-seen order
+        unique = {}
+        for query in queries:
+            unique.setdefault(self._query_key(query.lower()), query)
+        
+        uncached = [query for key, query in unique.items() if key not in self.cached_analyses]
+        embeddings = dict(zip(uncached, await self._embed_queries(uncached)))
+        
+        results = await asyncio.gather(*[
+            self.analyze_query(query, embeddings.get(query)) for query in unique.values()
+        ])
+        by_key = dict(zip(unique, results))
+        
+        # Duplicates get their own shallow copy so callers can annotate results independently
+        served = set()
+        batch = []
+        for query in queries:
+            key = self._query_key(query.lower())
+            result = by_key[key]
+            batch.append(result.copy() if key in served else result)
+            served.add(key)
+        return batch
+    
+    @staticmethod
+    def _query_key(query_lower: str) -> bytes:
+        """Exact-match cache key: 16-byte blake2b digest of the normalized query"""
+        return hashlib.blake2b(query_lower.strip().encode(), digest_size=16).digest()
+    
+    async def _embed_queries(self, queries: List[str]) -> List[Optional[np.ndarray]]:
+        """Embed several queries in one request as unit vectors (all None without Gemini or on error)"""
+        return await embed_texts(queries)
+    
+    async def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query as a unit vector for semantic cache lookup (None without Gemini)"""
+        return (await self._embed_queries([query]))[0]
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Analysis cache counters since startup (hit rate in percent)"""
+        hits = self._exact_hits + self._semantic_hits
+        return {
+            'cached_queries': len(self.cached_analyses),
+            'lookups': self._cache_lookups,
+            'exact_hits': self._exact_hits,
+            'semantic_hits': self._semantic_hits,
+            'hit_rate': round(100 * hits / self._cache_lookups, 1) if self._cache_lookups else 0.0,
+            'llm_calls_skipped': self._llm_calls_skipped
+        }
+    
+    def _find_similar_analysis(self, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """Nearest cached analysis by cosine similarity, if it clears the threshold"""
+        if not self._embedding_count:
+            return None
+        
+        similarities = self._embedding_matrix[:self._embedding_count] @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] >= SEMANTIC_CACHE_THRESHOLD:
+            return self._embedding_results[best]
+        return None
+    
+    def _get_cached_analysis(self, query_key: bytes) -> Optional[Dict[str, Any]]:
+        """Exact-match cache lookup; a hit becomes the most recently used entry"""
+        cached = self.cached_analyses.get(query_key)
+        if cached is not None:
+            self.cached_analyses.move_to_end(query_key)
+        return cached
+    
+    def _put_cached_analysis(self, query_key: bytes, result: Dict[str, Any]):
+        """Insert into the exact-match cache, evicting the least recently used entry when full"""
+        self.cached_analyses[query_key] = result
+        self.cached_analyses.move_to_end(query_key)
+        if len(self.cached_analyses) > self.max_cache_size:
+            self.cached_analyses.popitem(last=False)
+    
+    def _remember_analysis(self, query_key: bytes, embedding: Optional[np.ndarray], result: Dict[str, Any]):
+        """
+        Store an analysis in the exact-match cache and the semantic ring buffer.
+        The entry is a separate dict with the cache-hit metadata baked in, so hits return it
+        as-is without a per-hit copy; callers must treat analyses as read-only.
+        """
+        result = {**result, 'analysis_time_ms': 0.0, 'from_cache': True}
+        self._put_cached_analysis(query_key, result)
+        
+        if embedding is None:
+            return
+        
+        if self._embedding_matrix is None:
+            self._embedding_matrix = np.zeros((self.max_cache_size, embedding.shape[0]), dtype=np.float32)
+        
+        # Overwrite the oldest slot once the buffer is full
+        slot = self._embedding_next
+        self._embedding_matrix[slot] = embedding
+        self._embedding_results[slot] = result
+        self._embedding_next = (slot + 1) % self.max_cache_size
+        self._embedding_count = min(self._embedding_count + 1, self.max_cache_size)
+    
+    def extract_concepts(self, query: str, query_lower: Optional[str] = None) -> Dict[str, Set[str]]:
         """
         Extract subjects, stressors, and other concepts from query in <5ms
         Uses pre-compiled regex patterns for speed
+        
+        Args:
+            query: User's research question
+            query_lower: The query already lowercased by the caller, if available
         """
-        query_lower = query.lower()
+        if query_lower is None:
+            query_lower = query.lower()
         
         concepts = {
             'subjects': set(),
@@ -218,111 +582,79 @@ Format your response as JSON:
             'all': set()
         }
         
-        # Use pre-compiled patterns for fast extraction
-        subject_matches = self.concept_patterns['subjects'].findall(query_lower)
-        concepts['subjects'].update(subject_matches)
-        concepts['all'].update(subject_matches)
-        
-        stressor_matches = self.concept_patterns['stressors'].findall(query_lower)
-        concepts['stressors'].update(stressor_matches)
-        concepts['all'].update(stressor_matches)
-        
-        bio_matches = self.concept_patterns['biological'].findall(query_lower)
-        concepts['all'].update(bio_matches)
-        
-        # Also check against known subjects in graph
-        for subject in self.cartographer.graph['subjects'].keys():
-            if subject.lower() in query_lower:
-                concepts['subjects'].add(subject)
-                concepts['all'].add(subject)
-        
-        # Also check against known stressors in graph
-        for stressor in self.cartographer.graph['stressors'].keys():
-            if stressor.lower() in query_lower:
-                concepts['stressors'].add(stressor)
-                concepts['all'].add(stressor)
-        
-        # Additional biological terms
-        bio_terms = ['gene', 'protein', 'cell', 'tissue', 'bone', 'muscle', 
-                     'cardiovascular', 'immune', 'metabolism', 'growth',
-                     'photosynthesis', 'root', 'leaf', 'vision', 'retina']
-        
-        for term in bio_terms:
-            if term in query_lower:
-                concepts['all'].add(term.capitalize())
+        # Single pass over the query; the matched group names the category
+        for match in _CONCEPT_RE.finditer(query_lower):
+            kind = match.lastgroup
+            term = match.group()
+            if kind == 'biological':
+                concepts['all'].add(_BIO_TERM_LABELS[term])
+            else:
+                concepts[kind].add(term)
+                concepts['all'].add(term)
+        
+        # Also check against known subjects and stressors in graph (one automaton pass)
+        entity_automaton = self.cartographer.entity_automaton
+        if entity_automaton is not None:
+            for _, matches in entity_automaton.iter(query_lower):
+                for kind, entity in matches:
+                    concepts[kind].add(entity)
+                    concepts['all'].add(entity)
         
         return concepts
     
     def find_relevant_publications(self, concepts: Dict[str, Set[str]]) -> List[Dict[str, Any]]:
         """Find publications relevant to the extracted concepts"""
-        relevant_pubs = []
-        pub_ids = set()
-        
-        # Search by subject
-        for subject in concepts['subjects']:
-            pubs = self.cartographer.query_by_subject(subject)
-            for pub in pubs:
-                pub_id = pub.get('pmid', pub.get('title', '')[:50])
-                if pub_id not in pub_ids:
-                    pub_ids.add(pub_id)
-                    relevant_pubs.append(pub)
-        
-        # Search by stressor
-        for stressor in concepts['stressors']:
-            pubs = self.cartographer.query_by_stressor(stressor)
-            for pub in pubs:
-                pub_id = pub.get('pmid', pub.get('title', '')[:50])
-                if pub_id not in pub_ids:
-                    pub_ids.add(pub_id)
-                    relevant_pubs.append(pub)
-        
-        # Search by subject-stressor combinations
-        for subject in concepts['subjects']:
-            for stressor in concepts['stressors']:
-                pubs = self.cartographer.query_connection(subject, stressor)
-                for pub in pubs:
-                    pub_id = pub.get('pmid', pub.get('title', '')[:50])
-                    if pub_id not in pub_ids:
-                        pub_ids.add(pub_id)
-                        relevant_pubs.append(pub)
+        cartographer = self.cartographer
+        
+        # Union the subject and stressor postings into an insertion-ordered set of graph rows,
+        # so earlier sources rank first. Subject-stressor pairs need no separate pass: every
+        # publication in a pair's intersection is already in the subject's posting.
+        # Stop as soon as the limit is reached instead of collecting the whole tail.
+        relevant_rows = {}
+        for row in chain(
+            chain.from_iterable(cartographer.subject_rows(subject) for subject in concepts['subjects']),
+            chain.from_iterable(cartographer.stressor_rows(stressor) for stressor in concepts['stressors'])
+        ):
+            relevant_rows[row] = None
+            if len(relevant_rows) >= 50:  # Limit to top 50
+                break
         
         # FALLBACK: If we found fewer than 5 publications, do a broader keyword search
-        if len(relevant_pubs) < 5:
-            all_pubs_dict = self.cartographer.graph.get('publications', {})
-            query_keywords = [word.lower() for word in concepts['all']]
+        if len(relevant_rows) < 5:
+            query_keywords = {word.lower() for word in concepts['all']}
             
-            for pub_id, pub in all_pubs_dict.items():
-                if pub_id not in pub_ids:
-                    # Check if any keyword appears in title or abstract
-                    title = pub.get('title', '').lower()
-                    abstract = pub.get('abstract', '').lower()
-                    
-                    if any(keyword in title or keyword in abstract for keyword in query_keywords):
-                        pub_ids.add(pub_id)
-                        relevant_pubs.append(pub)
+            for row, pub in enumerate(cartographer.pub_rows):
+                if row not in relevant_rows:
+                    # Check if any keyword appears in title or abstract: a whole-word hit is a
+                    # C-level set intersection; only misses fall through to substring checks
+                    view = pub_view(pub)
+                    if (query_keywords & view.tokens
+                            or any(keyword in view.blob for keyword in query_keywords)):
+                        relevant_rows[row] = None
                         
-                        if len(relevant_pubs) >= 20:  # Get at least 20 for good AI analysis
+                        if len(relevant_rows) >= 20:  # Get at least 20 for good AI analysis
                             break
         
-        return relevant_pubs[:50]  # Limit to top 50
+        return cartographer.rows_to_publications(relevant_rows)
     
     def identify_consensus(self, publications: List[Dict[str, Any]], concepts: Dict[str, Set[str]]) -> str:
         """Identify the main consensus from publications"""
         if len(publications) < 3:
             return "Limited data available. "
         
-        subjects = list(concepts['subjects'])
-        stressors = list(concepts['stressors'])
+        # Join each concept set once, straight from the set (no intermediate list)
+        subjects = ', '.join(concepts['subjects'])
+        stressors = ', '.join(concepts['stressors'])
         
         if subjects and stressors:
             return (f"Based on {len(publications)} publications, research shows consistent "
-                   f"evidence regarding the effects of {', '.join(stressors)} on {', '.join(subjects)}. "
+                   f"evidence regarding the effects of {stressors} on {subjects}. "
                    f"Multiple studies confirm significant biological responses under these conditions.")
         elif subjects:
             return (f"Based on {len(publications)} publications, there is established research "
-                   f"on {', '.join(subjects)} in space biology contexts.")
+                   f"on {subjects} in space biology contexts.")
         elif stressors:
-            return (f"Based on {len(publications)} publications, the effects of {', '.join(stressors)} "
+            return (f"Based on {len(publications)} publications, the effects of {stressors} "
                    f"are well-documented across multiple biological systems.")
         else:
             return f"Analysis of {len(publications)} publications shows consistent findings in this research area."
@@ -336,15 +668,17 @@ Format your response as JSON:
             return []
         
         # Look for variation in publication years - older vs newer findings
-        years = [int(pub.get('year', 0)) for pub in publications if pub.get('year')]
-        if years:
-            old_pubs = [p for p in publications if int(p.get('year', 0)) < 2015]
-            new_pubs = [p for p in publications if int(p.get('year', 0)) >= 2015]
+        # Years are coerced to int once at graph-build time; count both eras with array masks
+        years = np.fromiter((pub_view(pub).year for pub in publications), dtype=np.int16, count=len(publications))
+        years = years[years > 0]
+        if years.size:
+            old_count = int((years < 2015).sum())
+            new_count = int((years >= 2015).sum())
             
-            if len(old_pubs) > 2 and len(new_pubs) > 2:
+            if old_count > 2 and new_count > 2:
                 return [
-                    f"Some variation exists between earlier studies (pre-2015, n={len(old_pubs)}) "
-                    f"and more recent research (post-2015, n={len(new_pubs)}), "
+                    f"Some variation exists between earlier studies (pre-2015, n={old_count}) "
+                    f"and more recent research (post-2015, n={new_count}), "
                     f"possibly due to improved methodologies or measurement techniques."
                 ]
         
@@ -358,44 +692,31 @@ Format your response as JSON:
         if len(publications) < 5:
             gaps.append(f"Limited research available (only {len(publications)} publications found). More studies needed.")
         
+        # Gap signals are flagged per publication at graph-build time; OR the top ten together
+        signals = 0
+        for pub in publications[:10]:
+            signals |= pub_view(pub).gap_flags
+            if signals == GAP_ALL:  # Every signal seen; the rest cannot change the outcome
+                break
+        
         # Check for long-term studies
-        if any('long-term' in str(pub.get('abstract', '')).lower() for pub in publications[:10]):
+        if signals & GAP_LONG_TERM:
             gaps.append("Long-term effects (>90 days) require additional investigation.")
         
         # Check for human studies vs animal models
-        has_human = any('human' in str(pub.get('title', '') + pub.get('abstract', '')).lower() 
-                       for pub in publications[:10])
-        has_animal = any(term in str(pub.get('title', '') + pub.get('abstract', '')).lower() 
-                        for term in ['mice', 'mouse', 'rat', 'rodent'] 
-                        for pub in publications[:10])
-        
-        if has_animal and not has_human:
+        if signals & GAP_ANIMAL and not signals & GAP_HUMAN:
             gaps.append("Translation of findings from animal models to human applications needs further validation.")
         
         # Check for mechanism studies
-        has_mechanism = any(term in str(pub.get('abstract', '')).lower() 
-                           for term in ['mechanism', 'pathway', 'molecular']
-                           for pub in publications[:10])
-        
-        if not has_mechanism:
+        if not signals & GAP_MECHANISM:
             gaps.append("Molecular mechanisms and pathways underlying these effects are not fully elucidated.")
         
         return gaps if gaps else ["Research in this area appears comprehensive. Consider specific sub-topics for deeper analysis."]
     
     def compile_evidence(self, publications: List[Dict[str, Any]]) -> List[Dict[str, str]]:
         """Compile key publications as evidence - returns different publications for each query"""
-        evidence = []
-        
-        # Take more publications to show variety (up to 15)
-        for pub in publications[:15]:  # Top 15 most relevant
-            evidence.append({
-                'title': pub.get('title', 'Untitled'),
-                'year': str(pub.get('year', 'N/A')),
-                'url': pub.get('url', '#'),
-                'journal': pub.get('journal', '')
-            })
-        
-        return evidence
+        # Take more publications to show variety (up to 15); cards are prebuilt at graph time
+        return [pub_view(pub).evidence for pub in publications[:15]]  # Top 15 most relevant
     
     def calculate_confidence(self, pub_count: int) -> str:
         """Calculate confidence level based on publication count"""
@@ -3,9 +3,65 @@ The Cartographer Agent - Ultra-Fast Knowledge Graph Constructor
 Role: Structure data into an interconnected knowledge graph in MILLISECONDS
 Optimized for: Instant graph operations and pattern discovery
 """
-from typing import List, Dict, Any, Set, Tuple, Optional
+from typing import List, Dict, Any, Set, Tuple, Optional, Sequence
 from collections import defaultdict
+from array import array
+from itertools import combinations
+import heapq
+import re
 import time
+import ahocorasick
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Knowledge-gap signal bit flags, detected once per publication
+GAP_LONG_TERM = 1
+GAP_HUMAN = 2
+GAP_ANIMAL = 4
+GAP_MECHANISM = 8
+GAP_ALL = GAP_LONG_TERM | GAP_HUMAN | GAP_ANIMAL | GAP_MECHANISM
+_GAP_RE = re.compile(
+    r'(?P<long_term>long-term)'
+    r'|(?P<human>\bhumans?\b)'
+    r'|(?P<animal>\b(?:mice|mouse|rats?|rodents?)\b)'
+    r'|(?P<mechanism>\b(?:mechanisms?|pathways?|molecular)\b)'
+)
+_GAP_FLAGS = {'long_term': GAP_LONG_TERM, 'human': GAP_HUMAN, 'animal': GAP_ANIMAL, 'mechanism': GAP_MECHANISM}
+
+
+class PubView:
+    """
+    Flat, read-only record of the publication fields the agents read on every query.
+    Built once per publication at graph-build time so hot loops use slot access
+    instead of repeated dict lookups with defaults.
+    """
+    __slots__ = ('row', 'title', 'abstract', 'year', 'pmid', 'blob', 'tokens', 'gap_flags', 'evidence')
+    
+    def __init__(self, pub: Dict[str, Any], row: int = -1):
+        self.row = row  # Dense graph row id (-1 for publications outside the graph)
+        self.title = pub.get('title', '')
+        self.abstract = pub.get('abstract', '')
+        year_label = str(pub.get('year', 'N/A'))
+        self.year = int(year_label) if year_label.isdigit() else 0  # 0 when unknown
+        self.pmid = pub.get('pmid', '')
+        # Evidence card served as-is by the Analyst; shared across queries, so treat as read-only
+        self.evidence = {
+            'title': self.title,
+            'year': year_label,
+            'url': pub.get('url', '#'),
+            'journal': pub.get('journal', '')
+        }
+        # Lowercased title+abstract and its token set, normalized once for keyword matching
+        self.blob = f"{self.title} {self.abstract}".lower()
+        self.tokens = frozenset(_TOKEN_RE.findall(self.blob))
+        self.gap_flags = 0  # OR of GAP_* bits found in the blob
+        for match in _GAP_RE.finditer(self.blob):
+            self.gap_flags |= _GAP_FLAGS[match.lastgroup]
+
+
+def pub_view(pub: Dict[str, Any]) -> PubView:
+    """Return the publication's cached view, building one for publications outside the graph"""
+    return pub.get('_view') or PubView(pub)
 
 
 class CartographerAgent:
@@ -28,13 +84,20 @@ class CartographerAgent:
         self.name = "The Cartographer"
         self.role = "Knowledge Graph Architect"
         
-        # Core graph structures with inverted indices
+        # Core graph structures with inverted indices. Postings hold dense int rows
+        # into pub_rows, so queries index a list instead of hashing string keys.
         self.graph = {
-            'publications': {},
-            'subjects': defaultdict(list),  # subject -> [pub_ids]
-            'stressors': defaultdict(list),  # stressor -> [pub_ids]
-            'connections': defaultdict(list)  # (subject, stressor) -> [pub_ids]
+            'publications': {},  # pub key (pmid or title prefix) -> publication
+            'subjects': defaultdict(lambda: array('I')),  # subject -> [rows]
+            'stressors': defaultdict(lambda: array('I'))  # stressor -> [rows]
         }
+        # (subject, stressor) connections are derived on demand by intersecting the two postings
+        
+        # Columnar publication storage, indexed by row
+        self.pub_rows: List[Dict[str, Any]] = []  # row -> publication
+        self._row_by_key: Dict[str, int] = {}
+        self._subject_mentions = 0  # Sum of len(subjects) over stored publications
+        self._stressor_mentions = 0  # Sum of len(stressors) over stored publications
         
         # Performance optimization caches
         self.cached_stats = None
@@ -42,6 +105,13 @@ class CartographerAgent:
         self.stressor_index = {}  # Normalized stressor -> canonical form
         self.is_initialized = False
         self.build_time = 0
+        self.entity_automaton = None  # Aho-Corasick over lowercase subject/stressor names
+        self._connection_count = None  # Distinct subject-stressor pairs, computed lazily
+        self._related_subjects: Dict[str, List[Tuple[str, int]]] = {}  # subject -> co-occurring subjects
+        self._subject_coverage: Dict[str, int] = {}  # subject -> publication count
+        self._stressor_coverage: Dict[str, int] = {}  # stressor -> publication count
+        self._top_subjects: List[Tuple[str, int]] = []
+        self._top_stressors: List[Tuple[str, int]] = []
     
     def log(self, message: str) -> str:
         """Format log message with agent identity"""
@@ -66,27 +136,50 @@ class CartographerAgent:
         
         for pub in publications:
             pub_id = pub.get('pmid', '') or pub.get('title', '')[:50]
+            subjects = pub.get('subjects', [])
+            stressors = pub.get('stressors', [])
             
-            # Store publication
+            # A repeated key keeps its row; the newest publication replaces the old one
+            row = self._row_by_key.get(pub_id)
+            if row is None:
+                row = self._row_by_key[pub_id] = len(self.pub_rows)
+                self.pub_rows.append(pub)
+            else:
+                replaced = self.pub_rows[row]
+                self._subject_mentions -= len(replaced.get('subjects', []))
+                self._stressor_mentions -= len(replaced.get('stressors', []))
+                self.pub_rows[row] = pub
+            
+            # Running totals for the per-publication averages, so stats need no extra pass
+            self._subject_mentions += len(subjects)
+            self._stressor_mentions += len(stressors)
+            
+            # Store publication with a flat view of its fields built once for every later query
+            pub['_view'] = PubView(pub, row)
             self.graph['publications'][pub_id] = pub
             
             # Index by subjects with normalization
-            for subject in pub.get('subjects', []):
+            for subject in subjects:
                 normalized = subject.lower().strip()
                 self.subject_index[normalized] = subject
-                self.graph['subjects'][subject].append(pub_id)
+                self.graph['subjects'][subject].append(row)
             
             # Index by stressors with normalization
-            for stressor in pub.get('stressors', []):
+            for stressor in stressors:
                 normalized = stressor.lower().strip()
                 self.stressor_index[normalized] = stressor
-                self.graph['stressors'][stressor].append(pub_id)
-            
-            # Create subject-stressor connections
-            for subject in pub.get('subjects', []):
-                for stressor in pub.get('stressors', []):
-                    key = (subject, stressor)
-                    self.graph['connections'][key].append(pub_id)
+                self.graph['stressors'][stressor].append(row)
+        
+        # One matcher for every entity name, so query-time lookup is independent of graph size
+        self.entity_automaton = self._build_entity_automaton()
+        self._connection_count = None
+        self._related_subjects = self._build_related_subjects()
+        
+        # Coverage counts and their top-5 (partial sort) only change when the graph does
+        self._subject_coverage = {subject: len(rows) for subject, rows in self.graph['subjects'].items()}
+        self._stressor_coverage = {stressor: len(rows) for stressor, rows in self.graph['stressors'].items()}
+        self._top_subjects = heapq.nlargest(5, self._subject_coverage.items(), key=lambda item: item[1])
+        self._top_stressors = heapq.nlargest(5, self._stressor_coverage.items(), key=lambda item: item[1])
         
         # Cache statistics for instant retrieval
         self.build_time = (time.time() - start_time) * 1000  # Convert to ms
@@ -95,20 +188,67 @@ class CartographerAgent:
             'total_publications': len(self.graph['publications']),
             'unique_subjects': len(self.graph['subjects']),
             'unique_stressors': len(self.graph['stressors']),
-            'connections': len(self.graph['connections']),
+            'connections': self.connection_count(),
             'build_time_ms': round(self.build_time, 2),
-            'avg_subjects_per_pub': round(
-                sum(len(pub.get('subjects', [])) for pub in self.graph['publications'].values()) / 
-                max(len(self.graph['publications']), 1), 2
-            ),
-            'avg_stressors_per_pub': round(
-                sum(len(pub.get('stressors', [])) for pub in self.graph['publications'].values()) / 
-                max(len(self.graph['publications']), 1), 2
-            )
+            'avg_subjects_per_pub': round(self._subject_mentions / max(len(self.pub_rows), 1), 2),
+            'avg_stressors_per_pub': round(self._stressor_mentions / max(len(self.pub_rows), 1), 2)
         }
         
         return self.cached_stats
     
+    def _build_entity_automaton(self) -> Optional[ahocorasick.Automaton]:
+        """
+        Build an Aho-Corasick automaton over every normalized subject and stressor name
+        so matching a query costs O(|query| + matches) regardless of graph size
+        """
+        automaton = ahocorasick.Automaton()
+        for kind, lower_to_canonical in (('subjects', self.subject_index), ('stressors', self.stressor_index)):
+            for key, entity in lower_to_canonical.items():
+                # A name can be both a subject and a stressor, so each key maps to a list of (kind, entity)
+                matches = automaton.get(key, [])
+                matches.append((kind, entity))
+                automaton.add_word(key, matches)
+        
+        if not len(automaton):
+            return None
+        automaton.make_automaton()
+        return automaton
+    
+    def _build_related_subjects(self) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Count subject co-occurrence once per build so related-subject lookups are a dict fetch.
+        Neighbors are sorted by shared publications, ties in subject index order.
+        """
+        subjects_by_row = defaultdict(list)
+        subject_order = {}
+        for order, (subject, rows) in enumerate(self.graph['subjects'].items()):
+            subject_order[subject] = order
+            for row in set(rows):
+                subjects_by_row[row].append(subject)
+        
+        co_occurrence = defaultdict(lambda: defaultdict(int))
+        for subjects in subjects_by_row.values():
+            for first, second in combinations(subjects, 2):
+                co_occurrence[first][second] += 1
+                co_occurrence[second][first] += 1
+        
+        return {
+            subject: sorted(neighbors.items(), key=lambda item: (-item[1], subject_order[item[0]]))
+            for subject, neighbors in co_occurrence.items()
+        }
+    
+    def connection_count(self) -> int:
+        """Number of distinct (subject, stressor) pairs that share at least one publication"""
+        if self._connection_count is None:
+            stressors_by_subject = defaultdict(set)
+            for pub in self.graph['publications'].values():
+                stressors = pub.get('stressors', [])
+                if stressors:
+                    for subject in pub.get('subjects', []):
+                        stressors_by_subject[subject].update(stressors)
+            self._connection_count = sum(len(stressors) for stressors in stressors_by_subject.values())
+        return self._connection_count
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get cached graph statistics in <5ms"""
         if self.cached_stats:
@@ -117,89 +257,100 @@ class CartographerAgent:
             'total_publications': len(self.graph['publications']),
             'unique_subjects': len(self.graph['subjects']),
             'unique_stressors': len(self.graph['stressors']),
-            'connections': len(self.graph['connections'])
+            'connections': self.connection_count()
         }
     
+    def rows_to_publications(self, rows) -> List[Dict[str, Any]]:
+        """Materialize publications for a sequence of graph rows"""
+        pub_rows = self.pub_rows
+        return [pub_rows[row] for row in rows]
+    
+    def subject_rows(self, subject: str) -> Sequence[int]:
+        """Posting rows for a subject, falling back to the normalized index when there is no exact match"""
+        rows = self.graph['subjects'].get(subject, [])
+        if not rows:
+            canonical = self.subject_index.get(subject.lower().strip())
+            if canonical:
+                rows = self.graph['subjects'].get(canonical, [])
+        return rows
+    
+    def stressor_rows(self, stressor: str) -> Sequence[int]:
+        """Posting rows for a stressor, falling back to the normalized index when there is no exact match"""
+        rows = self.graph['stressors'].get(stressor, [])
+        if not rows:
+            canonical = self.stressor_index.get(stressor.lower().strip())
+            if canonical:
+                rows = self.graph['stressors'].get(canonical, [])
+        return rows
+    
     def query_by_subject(self, subject: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Find all publications studying a specific subject in <10ms
         Supports fuzzy matching via normalized index
         """
-        # Try exact match first
-        pub_ids = self.graph['subjects'].get(subject, [])
-        
-        # Try normalized match if no exact match
-        if not pub_ids:
-            normalized = subject.lower().strip()
-            canonical = self.subject_index.get(normalized)
-            if canonical:
-                pub_ids = self.graph['subjects'].get(canonical, [])
+        rows = self.subject_rows(subject)
         
         # Apply limit if specified
         if limit:
-            pub_ids = pub_ids[:limit]
+            rows = rows[:limit]
             
-        return [self.graph['publications'][pid] for pid in pub_ids if pid in self.graph['publications']]
+        return self.rows_to_publications(rows)
     
     def query_by_stressor(self, stressor: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Find all publications applying a specific stressor in <10ms
         Supports fuzzy matching via normalized index
         """
-        # Try exact match first
-        pub_ids = self.graph['stressors'].get(stressor, [])
-        
-        # Try normalized match if no exact match
-        if not pub_ids:
-            normalized = stressor.lower().strip()
-            canonical = self.stressor_index.get(normalized)
-            if canonical:
-                pub_ids = self.graph['stressors'].get(canonical, [])
+        rows = self.stressor_rows(stressor)
         
         # Apply limit if specified
         if limit:
-            pub_ids = pub_ids[:limit]
+            rows = rows[:limit]
             
-        return [self.graph['publications'][pid] for pid in pub_ids if pid in self.graph['publications']]
+        return self.rows_to_publications(rows)
     
     def query_connection(self, subject: str, stressor: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Find publications studying a specific subject under a specific stressor in <10ms
+        Intersects the subject and stressor postings instead of storing every pair at build time
         """
-        pub_ids = self.graph['connections'].get((subject, stressor), [])
+        subject_rows = self.graph['subjects'].get(subject)
+        stressor_rows = self.graph['stressors'].get(stressor)
+        if not subject_rows or not stressor_rows:
+            return []
+        
+        # Filter the subject posting (build order) by membership in the stressor posting
+        stressor_set = set(stressor_rows)
+        rows = [row for row in subject_rows if row in stressor_set]
         
         # Apply limit if specified
         if limit:
-            pub_ids = pub_ids[:limit]
+            rows = rows[:limit]
             
-        return [self.graph['publications'][pid] for pid in pub_ids if pid in self.graph['publications']]
+        return self.rows_to_publications(rows)
     
-    def find_related_subjects(self, subject: str) -> List[Tuple[str, int]]:
+    def find_related_subjects(self, subject: str, limit: Optional[int] = None) -> List[Tuple[str, int]]:
         """
         Find subjects that appear in similar research contexts
         
+        Args:
+            subject: Subject to find neighbors for
+            limit: Return only the top `limit` neighbors (all when None)
+        
         Returns:
             List of (subject, shared_publications_count) tuples
         """
-        # Get all publications for this subject
-        target_pubs = set(self.graph['subjects'].get(subject, []))
-        
-        related = defaultdict(int)
-        for other_subject, pub_ids in self.graph['subjects'].items():
-            if other_subject != subject:
-                overlap = len(target_pubs.intersection(set(pub_ids)))
-                if overlap > 0:
-                    related[other_subject] = overlap
-        
-        return sorted(related.items(), key=lambda x: x[1], reverse=True)
+        # Co-occurrence lists are sorted at build time, so top-k is a prefix slice
+        related = self._related_subjects.get(subject, [])
+        return related[:limit] if limit else list(related)
     
     def get_stressor_coverage(self) -> Dict[str, int]:
         """Get publication count for each stressor"""
-        return {stressor: len(pubs) for stressor, pubs in self.graph['stressors'].items()}
+        return dict(self._stressor_coverage)
     
     def get_subject_coverage(self) -> Dict[str, int]:
         """Get publication count for each subject"""
-        return {subject: len(pubs) for subject, pubs in self.graph['subjects'].items()}
+        return dict(self._subject_coverage)
     
     def get_graph_stats(self) -> Dict[str, Any]:
         """Get comprehensive graph statistics"""
@@ -207,15 +358,7 @@ class CartographerAgent:
             'publications': len(self.graph['publications']),
             'subjects': len(self.graph['subjects']),
             'stressors': len(self.graph['stressors']),
-            'subject_stressor_pairs': len(self.graph['connections']),
-            'top_subjects': sorted(
-                [(s, len(p)) for s, p in self.graph['subjects'].items()],
-                key=lambda x: x[1],
-                reverse=True
-            )[:5],
-            'top_stressors': sorted(
-                [(s, len(p)) for s, p in self.graph['stressors'].items()],
-                key=lambda x: x[1],
-                reverse=True
-            )[:5]
+            'subject_stressor_pairs': self.connection_count(),
+            'top_subjects': list(self._top_subjects),
+            'top_stressors': list(self._top_stressors)
         }
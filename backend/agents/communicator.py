@@ -3,8 +3,57 @@ The Communicator Agent - Ultra-Fast Persona-Adapted Communication Specialist
 Role: Translate complex findings into clear, tailored messages in MILLISECONDS
 Optimized for: Instant response formatting with cached persona templates
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import re
 import time
+import orjson
+
+
+def _concept_key(concepts: List[str]) -> Tuple[str, ...]:
+    """Order- and case-insensitive cache key for a concept list"""
+    return tuple(sorted({concept.lower() for concept in concepts if concept}))
+
+
+@lru_cache(maxsize=256)
+def _concept_pattern(terms: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """
+    Compile one case-insensitive alternation over all concepts (cached per _concept_key).
+    Longer concepts come first so a phrase wins over any concept it contains.
+    """
+    if not terms:
+        return None
+    terms = sorted(terms, key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, terms)), re.IGNORECASE)
+
+
+# Pre-baked section formats per persona tone; unknown tones use the executive wording
+_CONSENSUS_TEMPLATES = {
+    'technical': '{badge}\n\n{consensus}',
+    'practical': '{badge}\n\n<strong>Key Finding:</strong> {consensus}',
+    'executive': '{badge}\n\n<strong>Bottom Line:</strong> {consensus}'
+}
+_CONTRADICTION_HEADERS = {
+    'technical': '<strong>Methodological Variations Detected:</strong>',
+    'practical': '<strong>Areas Requiring Careful Interpretation:</strong>',
+    'executive': '<strong>Key Uncertainties:</strong>'
+}
+_GAP_HEADERS = {
+    'technical': '<strong>Recommended Research Directions:</strong>',
+    'practical': '<strong>What We Still Need to Know:</strong>',
+    'executive': '<strong>Strategic Research Priorities:</strong>'
+}
+_NO_CONTRADICTIONS_MSG = "No major contradictions detected in the reviewed literature."
+
+# Record separator joining brief sections so they are highlighted in one regex pass
+_SECTION_SEP = '\x1e'
+
+
+def _highlight_match(match: re.Match) -> str:
+    text = match.group()
+    return f'<span class="concept-highlight" data-concept="{text.lower()}">{text}</span>'
 
 
 class CommunicatorAgent:
@@ -47,7 +96,7 @@ class CommunicatorAgent:
         }
         
         # Performance optimization caches
-        self.response_cache = {}
+        self.response_cache = OrderedDict()  # blake2b(persona, query, analysis fields) -> brief, LRU order
         self.max_cache_size = 50
         
     def log(self, message: str) -> str:
@@ -66,6 +115,13 @@ class CommunicatorAgent:
         Returns:
             Formatted brief with highlighted concepts and follow-up questions
         """
+        # Repeated (analysis, persona, query) triples reuse the finished brief
+        cache_key = self._response_key(analysis, persona, query)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            self.response_cache.move_to_end(cache_key)
+            return dict(cached)  # Callers add top-level keys (e.g. agent_log) to their copy
+        
         # Get persona style
         style = self.persona_styles.get(persona, self.persona_styles['Research Scientist'])
         
@@ -90,23 +146,15 @@ class CommunicatorAgent:
         )
         
         # Add concept highlighting
-        highlighted_consensus = self.highlight_concepts(
-            consensus_text,
-            analysis['highlighted_concepts']
-        )
-        highlighted_contradictions = self.highlight_concepts(
-            contradictions_text,
-            analysis['highlighted_concepts']
-        )
-        highlighted_gaps = self.highlight_concepts(
-            gaps_text,
+        highlighted_consensus, highlighted_contradictions, highlighted_gaps = self.highlight_sections(
+            (consensus_text, contradictions_text, gaps_text),
             analysis['highlighted_concepts']
         )
         
         # Generate follow-up questions
         follow_ups = self.generate_follow_ups(analysis, persona, query)
         
-        return {
+        response = {
             'brief': {
                 'consensus': highlighted_consensus,
                 'contradictions': highlighted_contradictions,
@@ -118,50 +166,47 @@ class CommunicatorAgent:
             'follow_up_questions': follow_ups,
             'persona': persona
         }
+        
+        self.response_cache[cache_key] = dict(response)
+        if len(self.response_cache) > self.max_cache_size:
+            self.response_cache.popitem(last=False)
+        
+        return response
+    
+    @staticmethod
+    def _response_key(analysis: Dict[str, Any], persona: str, query: str) -> bytes:
+        """Stable fingerprint of the persona, query, and every analysis field the brief is built from"""
+        payload = orjson.dumps((
+            persona,
+            query,
+            analysis['consensus'],
+            analysis['confidence'],
+            analysis['publication_count'],
+            analysis['contradictions'],
+            analysis['knowledge_gaps'],
+            analysis['highlighted_concepts'],
+            analysis['evidence']
+        ))
+        return hashlib.blake2b(payload, digest_size=16).digest()
     
     def format_consensus(self, consensus: str, confidence: str, pub_count: int, style: Dict) -> str:
         """Format consensus statement based on persona style"""
         confidence_badge = f"<strong>{confidence} Confidence</strong> (based on {pub_count} publications)"
-        
-        if style['tone'] == 'technical':
-            return f"{confidence_badge}\n\n{consensus}"
-        elif style['tone'] == 'practical':
-            return f"{confidence_badge}\n\n<strong>Key Finding:</strong> {consensus}"
-        else:  # executive
-            return f"{confidence_badge}\n\n<strong>Bottom Line:</strong> {consensus}"
+        template = _CONSENSUS_TEMPLATES.get(style['tone'], _CONSENSUS_TEMPLATES['executive'])
+        return template.format(badge=confidence_badge, consensus=consensus)
     
     def format_contradictions(self, contradictions: List[str], style: Dict) -> str:
         """Format contradictions based on persona style"""
         if not contradictions:
-            return "No major contradictions detected in the reviewed literature."
-        
-        if style['tone'] == 'technical':
-            header = "<strong>Methodological Variations Detected:</strong>"
-        elif style['tone'] == 'practical':
-            header = "<strong>Areas Requiring Careful Interpretation:</strong>"
-        else:  # executive
-            header = "<strong>Key Uncertainties:</strong>"
-        
-        formatted = [header]
-        for contradiction in contradictions:
-            formatted.append(f"<br/>• {contradiction}")
+            return _NO_CONTRADICTIONS_MSG
         
-        return ''.join(formatted)
+        header = _CONTRADICTION_HEADERS.get(style['tone'], _CONTRADICTION_HEADERS['executive'])
+        return header + ''.join(f"<br/>• {contradiction}" for contradiction in contradictions)
     
     def format_knowledge_gaps(self, gaps: List[str], style: Dict) -> str:
         """Format knowledge gaps based on persona style"""
-        if style['tone'] == 'technical':
-            header = "<strong>Recommended Research Directions:</strong>"
-        elif style['tone'] == 'practical':
-            header = "<strong>What We Still Need to Know:</strong>"
-        else:  # executive
-            header = "<strong>Strategic Research Priorities:</strong>"
-        
-        formatted = [header]
-        for gap in gaps:
-            formatted.append(f"<br/>• {gap}")
-        
-        return ''.join(formatted)
+        header = _GAP_HEADERS.get(style['tone'], _GAP_HEADERS['executive'])
+        return header + ''.join(f"<br/>• {gap}" for gap in gaps)
     
     def highlight_concepts(self, text: str, concepts: List[str]) -> str:
         """
@@ -174,18 +219,29 @@ class CommunicatorAgent:
         Returns:
             Text with concepts wrapped in <span> tags
         """
-        highlighted_text = text
-        
-        for concept in concepts:
-            # Case-insensitive replacement
-            import re
-            pattern = re.compile(re.escape(concept), re.IGNORECASE)
-            highlighted_text = pattern.sub(
-                lambda m: f'<span class="concept-highlight" data-concept="{concept.lower()}">{m.group()}</span>',
-                highlighted_text
-            )
-        
-        return highlighted_text
+        # One pass over the text for all concepts; inserted markup is never rescanned
+        pattern = _concept_pattern(_concept_key(concepts))
+        if pattern is None:
+            return text
+        return pattern.sub(_highlight_match, text)
+    
+    def highlight_sections(self, sections: Tuple[str, ...], concepts: List[str]) -> Tuple[str, ...]:
+        """
+        Highlight several text sections with a single regex pass
+        
+        Args:
+            sections: Texts to process
+            concepts: List of concepts to highlight
+            
+        Returns:
+            Highlighted texts, in the same order as sections
+        """
+        # Sections are joined on a control character that no concept can match across
+        if not any(_SECTION_SEP in part for part in (*sections, *concepts)):
+            highlighted = self.highlight_concepts(_SECTION_SEP.join(sections), concepts).split(_SECTION_SEP)
+            if len(highlighted) == len(sections):
+                return tuple(highlighted)
+        return tuple(self.highlight_concepts(section, concepts) for section in sections)
     
     def generate_follow_ups(self, analysis: Dict[str, Any], persona: str, query: str) -> List[str]:
         """
@@ -4,10 +4,87 @@ Role: Parse 608 publications in MILLISECONDS and provide instant query results
 Optimized for: Sub-second search across entire NASA publication database
 """
 import pandas as pd
+import numpy as np
 from typing import List, Dict, Any, Optional
 import os
 import re
+import sys
+import mmap
+import pickle
 from collections import defaultdict
+import ahocorasick
+
+
+# CSV columns read at load time (Link is served by the category endpoints via publications_cache)
+CSV_COLUMNS = ('Title', 'Abstract', 'PMID', 'Year', 'Journal', 'Link')
+# Compact dtypes: nullable ints/strings instead of float/object, repeated journals as categories
+CSV_DTYPES = {'PMID': 'string', 'Year': 'Int16', 'Journal': 'category'}
+
+# Bump when the cached index layout or the extraction vocabulary changes
+INDEX_CACHE_VERSION = 3
+
+# PMC number inside a publication link, e.g. .../pmc/articles/PMC3630201/
+PMC_ID_PATTERN = r'PMC(\d+)'
+
+# Shared capitalized subject labels: raw regex match -> interned display form
+_SUBJECT_LABELS: Dict[str, str] = {}
+
+
+def _subject_label(match: str) -> str:
+    """Capitalized subject label, shared across every publication that mentions it"""
+    label = _SUBJECT_LABELS.get(match)
+    if label is None:
+        label = _SUBJECT_LABELS[match] = sys.intern(match.capitalize())
+    return label
+
+
+# Stressor vocabulary terms grouped under a shared label; every other term is title-cased
+_STRESSOR_CANONICAL = {
+    'microgravity': 'Microgravity',
+    'gravity': 'Microgravity',
+    'radiation': 'Space Radiation',
+    'hypoxia': 'Hypoxia',
+    'oxygen': 'Hypoxia'
+}
+
+
+def _stressor_label(match: str) -> str:
+    """Canonical stressor label for a raw stressor match"""
+    return sys.intern(_STRESSOR_CANONICAL.get(match.lower()) or match.title())
+
+
+def _surface_forms(term: str) -> List[str]:
+    """Expand a vocabulary pattern's optional plural ('s?', 'e?') and optional whitespace ('\\s*')"""
+    forms = ['']
+    for part in re.split(r'(\\s\*|\w\?)', term):
+        if part == '\\s*':
+            forms = [form + joiner for form in forms for joiner in ('', ' ')]
+        elif len(part) == 2 and part.endswith('?'):
+            forms = [form + tail for form in forms for tail in ('', part[0])]
+        else:
+            forms = [form + part for form in forms]
+    return forms
+
+
+def _match_terms(automaton: ahocorasick.Automaton, text: str) -> List[List[str]]:
+    """
+    Scan text once for every subject and stressor surface form.
+    Per vocabulary, keeps leftmost-longest non-overlapping matches, which is what
+    the equivalent regex alternation would return with findall().
+    """
+    # Collapse whitespace runs so 'cosmic   rays' hits the single-space surface form
+    text = ' '.join(text.lower().split())
+    hits = sorted(
+        (end - length + 1, -length, kind, label)
+        for end, (kind, length, label) in automaton.iter(text)
+    )
+    labels: List[List[str]] = [[], []]
+    next_free = [0, 0]
+    for start, neg_length, kind, label in hits:
+        if start >= next_free[kind]:
+            labels[kind].append(label)
+            next_free[kind] = start - neg_length
+    return labels
 
 
 class LibrarianAgent:
@@ -25,6 +102,7 @@ class LibrarianAgent:
     - Filter by subject (organism) in <20ms
     - Filter by stressor (environment) in <20ms
     - Get all publications instantly (already in memory)
+    - Batch search/filter APIs answer many queries with one pass
     """
     
     def __init__(self):
@@ -33,13 +111,21 @@ class LibrarianAgent:
         
         # Pre-loaded data structures for instant access
         self.publications_cache = None
-        self.keyword_index = defaultdict(list)  # Inverted index: word -> [publication indices]
+        self.keyword_index = {}  # Inverted index: word -> int32 array of publication indices
         self.all_publications = []  # Pre-processed publications list
+        self._cols: Dict[str, List[Any]] = {}  # Parallel lowercased title/abstract columns scanned by phrase search
+        self.subject_index: Dict[str, List[int]] = {}  # Reverse index: lowercased subject -> publication rows
+        self.stressor_index: Dict[str, List[int]] = {}  # Reverse index: lowercased stressor -> publication rows
         self.is_initialized = False
         
+        # String pools so repeated journal/year values share one object
+        self._journal_pool: Dict[str, str] = {}
+        self._year_pool: Dict[str, str] = {}
+        
         # Pre-compiled regex patterns for speed
         self.subject_pattern = None
         self.stressor_pattern = None
+        self.term_automaton = None  # Aho-Corasick over subject + stressor surface forms
         
     def log(self, message: str) -> str:
         """Format log message with agent identity"""
@@ -79,24 +165,118 @@ class LibrarianAgent:
             raise FileNotFoundError("Could not find SB_publication_PMC.csv")
         
         try:
-            # Fast CSV loading
-            df = pd.read_csv(csv_path, low_memory=False)
+            # Reuse the on-disk index when the CSV has not changed since it was built
+            df = self._load_index_cache(csv_path)
+            if df is None:
+                # Fast CSV loading
+                df = self._read_csv(csv_path)
+                self._add_derived_columns(df)
+                
+                # Build search indices
+                self._build_search_indices(df)
+                self._save_index_cache(csv_path, df)
             self.publications_cache = df
             
-            # Build search indices
-            self._build_search_indices(df)
-            
             self.is_initialized = True
             return df
         except Exception as e:
             raise Exception(f"Error loading publications: {str(e)}")
     
-    def _build_search_indices(self, df: pd.DataFrame):
+    @staticmethod
+    def _read_csv(csv_path: str) -> pd.DataFrame:
         """
-        Pre-build inverted indices for millisecond-level search.
-        Transforms 608 publications into instant-search data structures.
-        Time cost: ~50ms one-time at startup.
+        Read only the columns the agents use, with compact dtypes.
+        Uses the pyarrow parser when it is installed, otherwise the C parser;
+        drops the dtype hints if the file's values do not fit them.
+        """
+        header = pd.read_csv(csv_path, nrows=0).columns
+        usecols = [column for column in header if column in CSV_COLUMNS]
+        dtype = {column: kind for column, kind in CSV_DTYPES.items() if column in usecols}
+        
+        attempts = (
+            {'engine': 'pyarrow', 'dtype': dtype},
+            {'low_memory': False, 'dtype': dtype},
+            {'low_memory': False}
+        )
+        for options in attempts[:-1]:
+            try:
+                return pd.read_csv(csv_path, usecols=usecols, **options)
+            except (ImportError, ValueError, TypeError):
+                continue
+        return pd.read_csv(csv_path, usecols=usecols, **attempts[-1])
+    
+    @staticmethod
+    def _add_derived_columns(df: pd.DataFrame):
+        """
+        Per-row values the category endpoints would otherwise recompute on every request:
+        title_lc (lowercased Title, '' when missing) and pmc_id (PMC number in Link, -1 when absent)
         """
+        titles = df['Title'] if 'Title' in df.columns else pd.Series('', index=df.index)
+        df['title_lc'] = titles.fillna('').astype(str).str.lower()
+        
+        links = df['Link'] if 'Link' in df.columns else pd.Series('', index=df.index)
+        pmc_ids = links.fillna('').astype(str).str.extract(PMC_ID_PATTERN, expand=False)
+        df['pmc_id'] = pd.to_numeric(pmc_ids, errors='coerce').fillna(-1).astype(np.int64)
+    
+    @staticmethod
+    def _index_cache_path(csv_path: str) -> str:
+        """Pickled index lives next to the CSV it was built from"""
+        return f"{os.path.abspath(csv_path)}.index.pkl"
+    
+    @staticmethod
+    def _csv_signature(csv_path: str) -> tuple:
+        """Identifies the exact CSV (and cache layout) an index was built from"""
+        stat = os.stat(csv_path)
+        return (INDEX_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    
+    def _load_index_cache(self, csv_path: str) -> Optional[pd.DataFrame]:
+        """
+        Restore publications and indices pickled by a previous start.
+        The file is mmapped and unpickled straight from the mapping.
+        
+        Returns:
+            The cached DataFrame, or None if there is no valid cache for this CSV
+        """
+        try:
+            with open(self._index_cache_path(csv_path), 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                cached = pickle.loads(buf)
+            if cached['signature'] != self._csv_signature(csv_path):
+                return None
+        except Exception:
+            # Missing, stale-format or unreadable cache: rebuild from the CSV
+            return None
+        
+        self._build_vocabulary()
+        self.all_publications = cached['publications']
+        self.keyword_index = cached['keyword_index']
+        self._cols = cached['cols']
+        self.subject_index = cached['subject_index']
+        self.stressor_index = cached['stressor_index']
+        return cached['df']
+    
+    def _save_index_cache(self, csv_path: str, df: pd.DataFrame):
+        """Pickle the freshly built index; best effort (the data directory may be read-only)"""
+        path = self._index_cache_path(csv_path)
+        payload = {
+            'signature': self._csv_signature(csv_path),
+            'df': df,
+            'publications': self.all_publications,
+            'keyword_index': self.keyword_index,
+            'cols': self._cols,
+            'subject_index': self.subject_index,
+            'stressor_index': self.stressor_index
+        }
+        try:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)  # Atomic swap so a concurrent start never reads a partial file
+        except OSError:
+            pass
+    
+    def _build_vocabulary(self):
+        """Compile the subject/stressor patterns and the extraction automaton (cheap, not cached)"""
         # Compile regex patterns once for fast matching
         subjects = ['mice?', 'mouse', 'rodents?', 'rats?', 'arabidopsis', 'plants?', 
                    'wheat', 'lettuce', 'humans?', 'cells?', 'tissues?', 
@@ -108,21 +288,78 @@ class LibrarianAgent:
         self.subject_pattern = re.compile('|'.join(subjects), re.IGNORECASE)
         self.stressor_pattern = re.compile('|'.join(stressors), re.IGNORECASE)
         
+        # One automaton over both vocabularies: surface form -> (kind, length, label)
+        automaton = ahocorasick.Automaton()
+        for kind, terms, to_label in ((0, subjects, _subject_label), (1, stressors, _stressor_label)):
+            for term in terms:
+                for form in _surface_forms(term):
+                    automaton.add_word(form, (kind, len(form), to_label(form)))
+        automaton.make_automaton()
+        self.term_automaton = automaton
+    
+    def _build_search_indices(self, df: pd.DataFrame):
+        """
+        Pre-build inverted indices for millisecond-level search.
+        Transforms 608 publications into instant-search data structures.
+        Time cost: ~50ms one-time at startup.
+        """
+        self._build_vocabulary()
+        
+        # Pull whole columns once instead of materializing a Series per row with iterrows()
+        titles = [str(title) for title in self._column(df, 'Title', '')]
+        abstracts = [str(abstract) for abstract in self._column(df, 'Abstract', '')]
+        
+        # Keywords (words 4+ characters) for every publication in one vectorized pass
+        combined = pd.Series([f"{title} {abstract}" for title, abstract in zip(titles, abstracts)], dtype=object)
+        keyword_lists = combined.str.lower().str.findall(r'\b\w{4,}\b').tolist()
+        
         # Pre-process all publications
-        self.all_publications = []
-        for idx, row in df.iterrows():
-            pub = self._process_publication(row.to_dict(), int(idx))  # type: ignore
-            self.all_publications.append(pub)
-            
-            # Build inverted index for instant keyword search
-            title = str(row.get('Title', '')).lower()
-            abstract = str(row.get('Abstract', '')).lower()
-            combined = f"{title} {abstract}"
-            
-            # Extract keywords (words 4+ characters)
-            words = set(re.findall(r'\b\w{4,}\b', combined))
-            for word in words:
-                self.keyword_index[word].append(idx)
+        self.all_publications = [
+            self._build_publication(int(idx), title, abstract, pmid, year, journal)
+            for idx, title, abstract, pmid, year, journal in zip(
+                df.index.tolist(), titles, abstracts,
+                self._text_column(df, 'PMID'), self._text_column(df, 'Year'), self._text_column(df, 'Journal')
+            )
+        ]
+        
+        # Build inverted index for instant keyword search
+        postings = defaultdict(list)
+        for idx, words in zip(df.index.tolist(), keyword_lists):
+            for word in set(words):
+                postings[word].append(idx)
+        
+        # Lowercased search columns, parallel to all_publications, so scans touch only the field they test
+        self._cols = {
+            'title_lc': [title.lower() for title in titles],
+            'abstract_lc': [abstract.lower() for abstract in abstracts]
+        }
+        
+        # Reverse category indices (rows ascending) so filters never scan every publication
+        subject_index = defaultdict(list)
+        stressor_index = defaultdict(list)
+        for row, pub in enumerate(self.all_publications):
+            for subject in pub['subjects']:
+                subject_index[subject.lower()].append(row)
+            for stressor in pub['stressors']:
+                stressor_index[stressor.lower()].append(row)
+        self.subject_index = dict(subject_index)
+        self.stressor_index = dict(stressor_index)
+        
+        # Freeze postings into int32 arrays so queries can be scored with numpy
+        self.keyword_index = {word: np.asarray(rows, dtype=np.int32) for word, rows in postings.items()}
+    
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str, default: Any = None) -> List[Any]:
+        """Column values as a plain list, or `default` for every row when the column is absent"""
+        return df[name].tolist() if name in df.columns else [default] * len(df)
+    
+    @staticmethod
+    def _text_column(df: pd.DataFrame, name: str) -> List[str]:
+        """Column values stringified in one vectorized pass, '' for missing values or an absent column"""
+        if name not in df.columns:
+            return [''] * len(df)
+        column = df[name]
+        return column.astype(str).where(column.notna(), '').tolist()
     
     def _process_publication(self, row: Dict[str, Any], idx: int) -> Dict[str, Any]:
         """
@@ -136,39 +373,34 @@ class LibrarianAgent:
         Returns:
             Structured publication data
         """
-        title = str(row.get('Title', ''))
-        abstract = str(row.get('Abstract', ''))
-        combined_text = f"{title} {abstract}"
-        
-        # Fast regex extraction
+        pmid, year, journal = (
+            str(row.get(field)) if pd.notna(row.get(field)) else ''
+            for field in ('PMID', 'Year', 'Journal')
+        )
+        return self._build_publication(
+            idx, str(row.get('Title', '')), str(row.get('Abstract', '')), pmid, year, journal
+        )
+    
+    def _build_publication(self, idx: int, title: str, abstract: str,
+                           pmid: str, year: str, journal: str) -> Dict[str, Any]:
+        """Structured publication from already-stringified field values ('' when missing)"""
+        # Single automaton pass finds subjects and stressors together
         subjects = []
-        if self.subject_pattern:
-            matches = self.subject_pattern.findall(combined_text)
-            subjects = list(set([s.capitalize() for s in matches]))
-        
         stressors = []
-        if self.stressor_pattern:
-            matches = self.stressor_pattern.findall(combined_text)
-            for match in matches:
-                if 'micro' in match.lower() or 'gravity' in match.lower():
-                    stressors.append('Microgravity')
-                elif 'radia' in match.lower():
-                    stressors.append('Space Radiation')
-                elif 'oxygen' in match.lower() or 'hypoxia' in match.lower():
-                    stressors.append('Hypoxia')
-                else:
-                    stressors.append(match.title())
-            stressors = list(set(stressors))
-        
-        pmid = str(row.get('PMID', '')) if pd.notna(row.get('PMID')) else ''
-        year = str(row.get('Year', '')) if pd.notna(row.get('Year')) else ''
+        if self.term_automaton:
+            subject_labels, stressor_labels = _match_terms(self.term_automaton, f"{title} {abstract}")
+            subjects = list(set(subject_labels))
+            stressors = list(set(stressor_labels))
+        
+        year = self._year_pool.setdefault(year, sys.intern(year))
+        journal = self._journal_pool.setdefault(journal, sys.intern(journal))
         
         return {
             'id': idx,
             'title': title,
             'pmid': pmid,
             'year': year,
-            'journal': str(row.get('Journal', '')) if pd.notna(row.get('Journal')) else '',
+            'journal': journal,
             'abstract': abstract,
             'subjects': subjects,
             'stressors': stressors,
@@ -194,23 +426,60 @@ class LibrarianAgent:
         query_words = set(re.findall(r'\b\w{4,}\b', query_lower))
         
         # Use inverted index for instant keyword matching
-        matching_indices = set()
-        relevance_scores = defaultdict(int)
-        
-        for word in query_words:
-            if word in self.keyword_index:
-                for idx in self.keyword_index[word]:
-                    matching_indices.add(idx)
-                    relevance_scores[idx] += 1
+        postings = [self.keyword_index[word] for word in query_words if word in self.keyword_index]
         
         # Fallback to phrase search if no keyword matches
-        if not matching_indices:
+        if not postings:
             return self.search_publications(query, limit)
         
-        # Rank by relevance and return top results
-        ranked = sorted(matching_indices, key=lambda x: relevance_scores[x], reverse=True)[:limit]
+        return self._rank_postings(postings, limit)
+    
+    def search_batch(self, queries: List[str], limit: int = 50) -> List[List[Dict[str, Any]]]:
+        """
+        Run several keyword searches at once (e.g. dashboard fan-out).
+        Repeated queries and words shared between queries are resolved once.
+        
+        Args:
+            queries: Search queries
+            limit: Maximum results per query
+            
+        Returns:
+            One ranked result list per query, in input order
+        """
+        if not self.is_initialized:
+            self.load_publications()
         
-        return [self.all_publications[idx] for idx in ranked if idx < len(self.all_publications)]
+        results_by_query: Dict[str, List[Dict[str, Any]]] = {}
+        postings_by_word: Dict[str, Any] = {}
+        for query in queries:
+            if query in results_by_query:
+                continue
+            postings = []
+            for word in set(re.findall(r'\b\w{4,}\b', query.lower())):
+                if word not in postings_by_word:
+                    postings_by_word[word] = self.keyword_index.get(word)
+                if postings_by_word[word] is not None:
+                    postings.append(postings_by_word[word])
+            results_by_query[query] = (
+                self._rank_postings(postings, limit) if postings else self.search_publications(query, limit)
+            )
+        
+        return [list(results_by_query[query]) for query in queries]
+    
+    def _rank_postings(self, postings: List[np.ndarray], limit: int) -> List[Dict[str, Any]]:
+        """Top `limit` publications by number of postings they appear in (ties by index)"""
+        # Relevance = number of query words each publication matches
+        pub_count = len(self.all_publications)
+        scores = np.bincount(np.concatenate(postings), minlength=pub_count)[:pub_count]
+        candidates = np.flatnonzero(scores)
+        
+        # Keep only candidates that can reach the top `limit`, then rank by relevance (ties by index)
+        if 0 < limit < len(candidates):
+            cutoff = np.partition(scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+            candidates = candidates[scores[candidates] >= cutoff]
+        ranked = candidates[np.argsort(-scores[candidates], kind='stable')][:limit]
+        
+        return [self.all_publications[idx] for idx in ranked.tolist()]
     
     def search_publications(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """
@@ -229,9 +498,9 @@ class LibrarianAgent:
         query_lower = query.lower()
         results = []
         
-        for pub in self.all_publications:
-            if query_lower in pub['title'].lower() or query_lower in pub['abstract'].lower():
-                results.append(pub)
+        for idx, (title_lc, abstract_lc) in enumerate(zip(self._cols['title_lc'], self._cols['abstract_lc'])):
+            if query_lower in title_lc or query_lower in abstract_lc:
+                results.append(self.all_publications[idx])
                 if len(results) >= limit:
                     break
         
@@ -252,16 +521,7 @@ class LibrarianAgent:
         if not self.is_initialized:
             self.load_publications()
         
-        subject_lower = subject.lower()
-        results = []
-        
-        for pub in self.all_publications:
-            if any(subject_lower in s.lower() for s in pub['subjects']):
-                results.append(pub)
-                if len(results) >= limit:
-                    break
-        
-        return results
+        return self._filter_index(self.subject_index, subject.lower(), limit)
     
     def filter_by_stressor(self, stressor: str, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -278,16 +538,49 @@ class LibrarianAgent:
         if not self.is_initialized:
             self.load_publications()
         
-        stressor_lower = stressor.lower()
-        results = []
+        return self._filter_index(self.stressor_index, stressor.lower(), limit)
+    
+    def filter_by_subjects(self, subjects: List[str], limit: int = 50) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Filter by several subjects at once (one reverse-index lookup each).
         
-        for pub in self.all_publications:
-            if any(stressor_lower in s.lower() for s in pub['stressors']):
-                results.append(pub)
-                if len(results) >= limit:
-                    break
+        Args:
+            subjects: Subjects to filter (e.g., ["mice", "plant"])
+            limit: Maximum results per subject
+            
+        Returns:
+            Publications per requested subject
+        """
+        if not self.is_initialized:
+            self.load_publications()
         
-        return results
+        return {subject: self._filter_index(self.subject_index, subject.lower(), limit) for subject in subjects}
+    
+    def filter_by_stressors(self, stressors: List[str], limit: int = 50) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Filter by several stressors at once (one reverse-index lookup each).
+        
+        Args:
+            stressors: Stressors to filter (e.g., ["microgravity", "radiation"])
+            limit: Maximum results per stressor
+            
+        Returns:
+            Publications per requested stressor
+        """
+        if not self.is_initialized:
+            self.load_publications()
+        
+        return {stressor: self._filter_index(self.stressor_index, stressor.lower(), limit) for stressor in stressors}
+    
+    def _filter_index(self, index: Dict[str, List[int]], name_lower: str, limit: int) -> List[Dict[str, Any]]:
+        """First `limit` publications (in corpus order) whose category in `index` equals or contains name_lower"""
+        # Partial names (e.g. 'plant' -> 'plants') match by substring over the few category keys, not the corpus
+        labels = [label for label in index if name_lower in label]
+        if labels == [name_lower]:
+            rows = index[name_lower]
+        else:
+            rows = sorted({row for label in labels for row in index[label]})
+        return [self.all_publications[row] for row in rows[:limit]]
     
     def get_all_publications(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -341,26 +634,14 @@ class LibrarianAgent:
     # Legacy compatibility methods
     def extract_subjects(self, text: str) -> List[str]:
         """Extract subjects from text (legacy compatibility)"""
-        if self.subject_pattern:
-            matches = self.subject_pattern.findall(text)
-            return list(set([s.capitalize() for s in matches]))
+        if self.term_automaton:
+            return list(set(_match_terms(self.term_automaton, text)[0]))
         return []
     
     def extract_stressors(self, text: str) -> List[str]:
         """Extract stressors from text (legacy compatibility)"""
-        if self.stressor_pattern:
-            matches = self.stressor_pattern.findall(text)
-            stressors = []
-            for match in matches:
-                if 'micro' in match.lower() or 'gravity' in match.lower():
-                    stressors.append('Microgravity')
-                elif 'radia' in match.lower():
-                    stressors.append('Space Radiation')
-                elif 'oxygen' in match.lower() or 'hypoxia' in match.lower():
-                    stressors.append('Hypoxia')
-                else:
-                    stressors.append(match.title())
-            return list(set(stressors))
+        if self.term_automaton:
+            return list(set(_match_terms(self.term_automaton, text)[1]))
         return []
     
     def ingest_publication(self, row: Dict[str, Any]) -> Dict[str, Any]:
@@ -10,16 +10,134 @@ Parses data from multiple NASA sources in real-time:
 - Cached results with TTL (Time To Live)
 - Rate limiting to respect NASA servers
 - Background refresh for up-to-date data
+- Conditional GETs (ETag / Last-Modified) skip re-parsing unchanged pages
 """
 import asyncio
 import aiohttp
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from bs4 import BeautifulSoup
 import requests
 from datetime import datetime, timedelta
 import time
 import re
-from collections import defaultdict
+from collections import defaultdict, Counter, OrderedDict
+from urllib.parse import urlsplit
+
+# C-based lxml parser when installed; the pure-Python parser is 5-10x slower on large pages
+try:
+    from lxml import etree
+    HTML_PARSER = 'lxml'
+except ImportError:
+    etree = None
+    HTML_PARSER = 'html.parser'
+
+# Fallback link scan limit (first N links on the page)
+MAX_FALLBACK_LINKS = 50
+
+
+# How each source's page is parsed: record containers, their precompiled class pattern and title tags,
+# plus the link-fallback filter used when no containers are found
+SOURCE_PARSERS = {
+    'biological_physical': {
+        'containers': ['article', 'div'],
+        'class_re': re.compile('dataset|publication|project', re.I),
+        'title_tags': ['h1', 'h2', 'h3', 'h4', 'a'],
+        'record_type': 'dataset',
+        'min_link_text': 10,
+        'link_keywords': None,
+        'link_type': 'resource'
+    },
+    'nslsl': {
+        'containers': ['div', 'section', 'article'],
+        'class_re': re.compile('facility|equipment|lab', re.I),
+        'title_tags': ['h1', 'h2', 'h3', 'h4'],
+        'record_type': 'facility',
+        'min_link_text': 10,
+        'link_keywords': None,
+        'link_type': 'resource'
+    },
+    'taskbook': {
+        'containers': ['div', 'tr', 'article'],
+        'class_re': re.compile('task|project|research', re.I),
+        'title_tags': ['h1', 'h2', 'h3', 'h4', 'td'],
+        'record_type': 'research_task',
+        'min_link_text': 15,
+        'link_keywords': ('research', 'study', 'investigation', 'task'),
+        'link_type': 'research_task'
+    }
+}
+
+
+def _parse_html(body: bytes, charset: Optional[str]) -> BeautifulSoup:
+    """Parse raw response bytes with a known encoding so BeautifulSoup skips encoding detection"""
+    return BeautifulSoup(body, HTML_PARSER, from_encoding=charset or 'utf-8')
+
+
+def _compile_xpaths(parser: Dict[str, Any]) -> Dict[str, Any]:
+    """Precompiled XPath equivalents of a SOURCE_PARSERS entry's BeautifulSoup lookups"""
+    def any_tag(tags: List[str]) -> str:
+        return ' or '.join(f'self::{tag}' for tag in tags)
+    
+    return {
+        # find_all(containers, class_=class_re): EXSLT re:test runs the same case-insensitive search
+        'containers': etree.XPath(
+            f"//*[{any_tag(parser['containers'])}][re:test(@class, '{parser['class_re'].pattern}', 'i')]",
+            namespaces={'re': 'http://exslt.org/regular-expressions'}
+        ),
+        # item.find(title_tags): first matching descendant in document order
+        'title': etree.XPath(f"(.//*[{any_tag(parser['title_tags'])}])[1]")
+    }
+
+
+if etree is not None:
+    _SOURCE_XPATHS = {source_key: _compile_xpaths(parser) for source_key, parser in SOURCE_PARSERS.items()}
+    # get_text(strip=True) skips script/style contents and comments
+    _TEXT_XPATH = etree.XPath('.//text()[not(parent::script or parent::style)]', smart_strings=False)
+    _LINKS_XPATH = etree.XPath(f'(//a[@href])[position() <= {MAX_FALLBACK_LINKS}]')
+
+
+def _element_text(element) -> str:
+    """lxml equivalent of BeautifulSoup's get_text(strip=True)"""
+    if not len(element):  # Leaf element (the usual title or link): its only text node is .text
+        return element.text.strip() if element.text else ''
+    return ''.join(text.strip() for text in _TEXT_XPATH(element))
+
+
+def _scrape_page(body: bytes, charset: Optional[str], source_key: str) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Extract record titles from a source page; when there are none, the first links as (text, href).
+    
+    With lxml installed, precompiled XPath queries run directly on the libxml2 tree,
+    skipping BeautifulSoup's Python-side tree construction and element walk.
+    """
+    if etree is not None:
+        try:
+            root = etree.fromstring(body, etree.HTMLParser(encoding=charset or 'utf-8'))
+        except (etree.XMLSyntaxError, etree.ParserError, LookupError):
+            root = None  # Let BeautifulSoup take the page
+        else:
+            if root is None:  # Empty document
+                return [], []
+            xpaths = _SOURCE_XPATHS[source_key]
+            titles = []
+            for item in xpaths['containers'](root):
+                title_elem = xpaths['title'](item)
+                if title_elem:
+                    titles.append(_element_text(title_elem[0]))
+            if titles:
+                return titles, []
+            return [], [(_element_text(link), link.get('href')) for link in _LINKS_XPATH(root)]
+    
+    parser = SOURCE_PARSERS[source_key]
+    soup = _parse_html(body, charset)
+    titles = []
+    for item in soup.find_all(parser['containers'], class_=parser['class_re']):
+        title_elem = item.find(parser['title_tags'])
+        if title_elem:
+            titles.append(title_elem.get_text(strip=True))
+    if titles:
+        return titles, []
+    return [], [(link.get_text(strip=True), link['href']) for link in soup.find_all('a', href=True, limit=MAX_FALLBACK_LINKS)]
 
 
 class NASADataSourceManager:
@@ -39,7 +157,7 @@ class NASADataSourceManager:
     - Background refresh: Non-blocking
     """
     
-    def __init__(self, cache_ttl_minutes: int = 60):
+    def __init__(self, cache_ttl_minutes: int = 60, soft_ttl_minutes: Optional[int] = None):
         self.name = "NASA Data Source Manager"
         
         # Data sources
@@ -49,29 +167,54 @@ class NASADataSourceManager:
                 'name': 'NASA Biological & Physical Sciences',
                 'last_fetch': None,
                 'data': [],
-                'status': 'not_fetched'
+                'status': 'not_fetched',
+                'etag': None,
+                'last_modified': None
             },
             'nslsl': {
                 'url': 'https://public.ksc.nasa.gov/nslsl/',
                 'name': 'NASA Space Life Sciences Lab',
                 'last_fetch': None,
                 'data': [],
-                'status': 'not_fetched'
+                'status': 'not_fetched',
+                'etag': None,
+                'last_modified': None
             },
             'taskbook': {
                 'url': 'https://taskbook.nasaprs.com/tbp/welcome.cfm',
                 'name': 'NASA Task Book',
                 'last_fetch': None,
                 'data': [],
-                'status': 'not_fetched'
+                'status': 'not_fetched',
+                'etag': None,
+                'last_modified': None
             }
         }
         
         # Performance settings
-        self.cache_ttl = timedelta(minutes=cache_ttl_minutes)
-        self.rate_limit_delay = 1.0  # 1 second between requests
+        self.cache_ttl = timedelta(minutes=cache_ttl_minutes)  # Hard TTL: older data blocks on a re-fetch
+        # Soft TTL: older (but not hard-expired) data is served while a background refresh runs
+        self.soft_ttl = timedelta(minutes=cache_ttl_minutes / 2 if soft_ttl_minutes is None else soft_ttl_minutes)
+        # Single-flight: in-flight task per key ('all' or a source key), shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.rate_limit_delay = 1.0  # Minimum seconds between requests to the same host
+        self.max_concurrent_fetches = 3
+        self._fetch_semaphore = asyncio.Semaphore(self.max_concurrent_fetches)
+        self._last_hit: Dict[str, float] = {}  # host -> monotonic time of its latest (or reserved) request
         self.timeout = 30  # 30 second timeout
         self.max_retries = 3
+        self.max_records_per_source = 500  # Parsed records kept per source, in page order
+        
+        # Search index over cached record titles, rebuilt lazily after any source refresh
+        self._postings: Optional[Dict[str, List[int]]] = None  # title token -> positions in _indexed_records
+        self._indexed_records: List[tuple] = []  # (source_key, record) in source order
+        self._keyword_matches: Dict[str, frozenset] = {}  # query keyword -> matching positions, per index build
+        self._data_version = 0  # Bumped whenever any source's data is replaced
+        self._search_cache = OrderedDict()  # (data_version, query, limit) -> results, LRU order
+        self.max_search_cache_size = 256
+        
+        # Shared HTTP session: keeps the connection pool, DNS cache and TLS sessions across fetches
+        self._session: Optional[aiohttp.ClientSession] = None
         
         # Statistics
         self.stats = {
@@ -86,6 +229,20 @@ class NASADataSourceManager:
         """Format log message"""
         return f"[{self.name}] {message}"
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the shared ClientSession on first use (must run inside the event loop)"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300, keepalive_timeout=60)
+            )
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session (call on shutdown)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
     async def fetch_all_sources(self) -> Dict[str, Any]:
         """
         Fetch data from all NASA sources in parallel
@@ -93,30 +250,52 @@ class NASADataSourceManager:
         **PERFORMANCE:**
         - Runs all fetches in parallel using asyncio
         - Total time: ~2-5 seconds (slowest source)
-        - Returns cached data if fresh (<1 hour old)
+        - Returns cached data instantly if younger than the soft TTL
+        - Between soft and hard TTL: returns cached data and refreshes in the background
+        - Concurrent callers share one in-flight refresh
         
         Returns:
             Statistics about fetched data
         """
-        start_time = time.time()
-        
-        # Check if cache is still fresh
         if self._is_cache_fresh():
+            age = datetime.now() - self.stats['last_update']
+            refreshing = False
+            if age >= self.soft_ttl:
+                self._start_refresh()
+                refreshing = True
             return {
                 'status': 'cached',
                 'total_records': self.stats['total_records'],
                 'sources': {k: len(v['data']) for k, v in self.sources.items()},
-                'cache_age_minutes': (datetime.now() - self.stats['last_update']).seconds // 60
+                'cache_age_minutes': age.seconds // 60,
+                'refreshing': refreshing
             }
         
-        # Fetch all sources in parallel
-        tasks = [
-            self.fetch_biological_physical_data(),
-            self.fetch_nslsl_data(),
-            self.fetch_taskbook_data()
-        ]
+        # Hard-expired (or never fetched): wait for the shared refresh; shield it from caller cancellation
+        return await asyncio.shield(self._start_refresh())
+    
+    def _start_refresh(self) -> asyncio.Task:
+        """Return the in-flight refresh task, starting one if none is running"""
+        return self._single_flight('all', self._refresh_all)
+    
+    def _single_flight(self, key: str, start) -> asyncio.Task:
+        """Task for `key`: the one already in flight, or a new one running start()"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(start())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _task: self._inflight.pop(key, None))
+        return task
+    
+    async def _refresh_all(self) -> Dict[str, Any]:
+        """Re-fetch every source in parallel and update statistics"""
+        start_time = time.time()
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Fetch all sources in parallel
+        results = await asyncio.gather(
+            *(self._fetch_source(source_key) for source_key in self.sources),
+            return_exceptions=True
+        )
         
         # Update statistics
         self.stats['last_update'] = datetime.now()
@@ -148,63 +327,7 @@ class NASADataSourceManager:
         - Research projects
         - Publications
         """
-        source_key = 'biological_physical'
-        start_time = time.time()
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.sources[source_key]['url'],
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    if response.status != 200:
-                        self.sources[source_key]['status'] = f'error_{response.status}'
-                        return []
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Parse data (structure depends on actual page)
-                    datasets = []
-                    
-                    # Look for dataset links or entries
-                    # This is a generic parser - actual implementation depends on page structure
-                    for item in soup.find_all(['article', 'div'], class_=re.compile('dataset|publication|project', re.I)):
-                        title_elem = item.find(['h1', 'h2', 'h3', 'h4', 'a'])
-                        if title_elem:
-                            datasets.append({
-                                'source': 'NASA Biological & Physical Sciences',
-                                'title': title_elem.get_text(strip=True),
-                                'url': self.sources[source_key]['url'],
-                                'type': 'dataset',
-                                'fetched_at': datetime.now().isoformat()
-                            })
-                    
-                    # If no specific elements found, look for links
-                    if not datasets:
-                        links = soup.find_all('a', href=True)
-                        for link in links[:50]:  # Limit to first 50 links
-                            text = link.get_text(strip=True)
-                            if text and len(text) > 10:  # Filter out navigation links
-                                datasets.append({
-                                    'source': 'NASA Biological & Physical Sciences',
-                                    'title': text,
-                                    'url': link['href'] if link['href'].startswith('http') else self.sources[source_key]['url'] + link['href'],
-                                    'type': 'resource',
-                                    'fetched_at': datetime.now().isoformat()
-                                })
-                    
-                    self.sources[source_key]['data'] = datasets
-                    self.sources[source_key]['last_fetch'] = datetime.now()
-                    self.sources[source_key]['status'] = 'success'
-                    self.stats['fetch_times'][source_key] = round((time.time() - start_time) * 1000, 2)
-                    
-                    return datasets
-        
-        except Exception as e:
-            self.sources[source_key]['status'] = f'error: {str(e)}'
-            self.stats['fetch_times'][source_key] = round((time.time() - start_time) * 1000, 2)
-            return []
+        return await self._fetch_source('biological_physical')
     
     async def fetch_nslsl_data(self) -> List[Dict[str, Any]]:
         """
@@ -215,62 +338,7 @@ class NASADataSourceManager:
         - Research facilities
         - Experimental protocols
         """
-        source_key = 'nslsl'
-        start_time = time.time()
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    self.sources[source_key]['url'],
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    if response.status != 200:
-                        self.sources[source_key]['status'] = f'error_{response.status}'
-                        return []
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Parse lab data
-                    lab_data = []
-                    
-                    # Look for facility/equipment information
-                    for item in soup.find_all(['div', 'section', 'article'], class_=re.compile('facility|equipment|lab', re.I)):
-                        title_elem = item.find(['h1', 'h2', 'h3', 'h4'])
-                        if title_elem:
-                            lab_data.append({
-                                'source': 'NASA Space Life Sciences Lab',
-                                'title': title_elem.get_text(strip=True),
-                                'url': self.sources[source_key]['url'],
-                                'type': 'facility',
-                                'fetched_at': datetime.now().isoformat()
-                            })
-                    
-                    # Fallback: extract meaningful links
-                    if not lab_data:
-                        links = soup.find_all('a', href=True)
-                        for link in links[:50]:
-                            text = link.get_text(strip=True)
-                            if text and len(text) > 10:
-                                lab_data.append({
-                                    'source': 'NASA Space Life Sciences Lab',
-                                    'title': text,
-                                    'url': link['href'] if link['href'].startswith('http') else self.sources[source_key]['url'] + link['href'],
-                                    'type': 'resource',
-                                    'fetched_at': datetime.now().isoformat()
-                                })
-                    
-                    self.sources[source_key]['data'] = lab_data
-                    self.sources[source_key]['last_fetch'] = datetime.now()
-                    self.sources[source_key]['status'] = 'success'
-                    self.stats['fetch_times'][source_key] = round((time.time() - start_time) * 1000, 2)
-                    
-                    return lab_data
-        
-        except Exception as e:
-            self.sources[source_key]['status'] = f'error: {str(e)}'
-            self.stats['fetch_times'][source_key] = round((time.time() - start_time) * 1000, 2)
-            return []
+        return await self._fetch_source('nslsl')
     
     async def fetch_taskbook_data(self) -> List[Dict[str, Any]]:
         """
@@ -281,61 +349,124 @@ class NASADataSourceManager:
         - Principal investigators
         - Project descriptions
         """
-        source_key = 'taskbook'
+        return await self._fetch_source('taskbook')
+    
+    async def _wait_for_host(self, url: str):
+        """Sleep until rate_limit_delay has passed since the previous request to url's host"""
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        slot = max(now, self._last_hit.get(host, float('-inf')) + self.rate_limit_delay)
+        self._last_hit[host] = slot  # Reserve the slot before sleeping so concurrent callers queue behind it
+        if slot > now:
+            await asyncio.sleep(slot - now)
+    
+    async def _fetch_source(self, source_key: str) -> List[Dict[str, Any]]:
+        """
+        Fetch and parse one source using its entry in SOURCE_PARSERS.
+        Concurrent calls for the same source share a single request.
+        
+        Args:
+            source_key: Key into self.sources / SOURCE_PARSERS
+            
+        Returns:
+            Parsed records (empty on HTTP or network errors; see the source status)
+        """
+        return await asyncio.shield(self._single_flight(source_key, lambda: self._scrape_source(source_key)))
+    
+    async def _scrape_source(self, source_key: str) -> List[Dict[str, Any]]:
+        """Request and parse one source, recording its status and timing"""
+        source = self.sources[source_key]
+        parser = SOURCE_PARSERS[source_key]
         start_time = time.time()
         
+        # Conditional GET: an unchanged page comes back as a bodiless 304 and is not re-parsed
+        headers = {}
+        if source['etag']:
+            headers['If-None-Match'] = source['etag']
+        if source['last_modified']:
+            headers['If-Modified-Since'] = source['last_modified']
+        
         try:
-            async with aiohttp.ClientSession() as session:
+            session = await self._get_session()
+            async with self._fetch_semaphore:
+                await self._wait_for_host(source['url'])
+                start_time = time.time()  # Time the request itself, not the politeness delay
                 async with session.get(
-                    self.sources[source_key]['url'],
+                    source['url'],
+                    headers=headers,
                     timeout=aiohttp.ClientTimeout(total=self.timeout)
                 ) as response:
+                    if response.status == 304:
+                        source['etag'] = response.headers.get('ETag', source['etag'])
+                        source['last_modified'] = response.headers.get('Last-Modified', source['last_modified'])
+                        source['last_fetch'] = datetime.now()
+                        source['status'] = 'success'
+                        self.stats['fetch_times'][source_key] = round((time.time() - start_time) * 1000, 2)
+                        return source['data']
+                    
                     if response.status != 200:
-                        self.sources[source_key]['status'] = f'error_{response.status}'
+                        source['status'] = f'error_{response.status}'
                         return []
                     
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    # Parse task data
-                    tasks = []
+                    # Look for entries whose class marks them as this source's record type
+                    # This is a generic parser - actual implementation depends on page structure
+                    titles, links = _scrape_page(await response.read(), response.charset, source_key)
+                    fetched_at = datetime.now().isoformat()
+                    records = [
+                        {
+                            'source': source['name'],
+                            'title': title,
+                            'url': source['url'],
+                            'type': parser['record_type'],
+                            'fetched_at': fetched_at
+                        }
+                        for title in titles
+                    ]
                     
-                    # Look for task/project entries
-                    for item in soup.find_all(['div', 'tr', 'article'], class_=re.compile('task|project|research', re.I)):
-                        title_elem = item.find(['h1', 'h2', 'h3', 'h4', 'td'])
-                        if title_elem:
-                            tasks.append({
-                                'source': 'NASA Task Book',
-                                'title': title_elem.get_text(strip=True),
-                                'url': self.sources[source_key]['url'],
-                                'type': 'research_task',
-                                'fetched_at': datetime.now().isoformat()
-                            })
+                    # Fallback: extract meaningful links
+                    for text, href in links:
+                        # Filter out navigation links (and, for some sources, off-topic links)
+                        if len(text) <= parser['min_link_text']:
+                            continue
+                        if parser['link_keywords'] and not any(keyword in text.lower() for keyword in parser['link_keywords']):
+                            continue
+                        records.append({
+                            'source': source['name'],
+                            'title': text,
+                            'url': href if href.startswith('http') else source['url'] + href,
+                            'type': parser['link_type'],
+                            'fetched_at': fetched_at
+                        })
                     
-                    # Fallback: extract task links
-                    if not tasks:
-                        links = soup.find_all('a', href=True)
-                        for link in links[:50]:
-                            text = link.get_text(strip=True)
-                            # Filter for task-like entries
-                            if text and len(text) > 15 and any(keyword in text.lower() for keyword in ['research', 'study', 'investigation', 'task']):
-                                tasks.append({
-                                    'source': 'NASA Task Book',
-                                    'title': text,
-                                    'url': link['href'] if link['href'].startswith('http') else self.sources[source_key]['url'] + link['href'],
-                                    'type': 'research_task',
-                                    'fetched_at': datetime.now().isoformat()
-                                })
+                    # Drop repeated titles (pages repeat cards and nav links) and cap the list size;
+                    # titles are case-folded once here for search
+                    unique_records, titles_lower, seen = [], [], set()
+                    for record in records:
+                        title_lower = record['title'].lower()
+                        if title_lower in seen:
+                            continue
+                        seen.add(title_lower)
+                        unique_records.append(record)
+                        titles_lower.append(title_lower)
+                        if len(unique_records) >= self.max_records_per_source:
+                            break
+                    records = unique_records
                     
-                    self.sources[source_key]['data'] = tasks
-                    self.sources[source_key]['last_fetch'] = datetime.now()
-                    self.sources[source_key]['status'] = 'success'
+                    source['data'] = records
+                    # Case-folded titles, tagged with the list they belong to
+                    source['titles_lower'] = (records, titles_lower)
+                    self._postings = None  # Invalidate the search index
+                    self._data_version += 1  # ...and every cached search result
+                    source['etag'] = response.headers.get('ETag')
+                    source['last_modified'] = response.headers.get('Last-Modified')
+                    source['last_fetch'] = datetime.now()
+                    source['status'] = 'success'
                     self.stats['fetch_times'][source_key] = round((time.time() - start_time) * 1000, 2)
                     
-                    return tasks
-        
+                    return records
+            
         except Exception as e:
-            self.sources[source_key]['status'] = f'error: {str(e)}'
+            source['status'] = f'error: {str(e)}'
             self.stats['fetch_times'][source_key] = round((time.time() - start_time) * 1000, 2)
             return []
     
@@ -355,25 +486,71 @@ class NASADataSourceManager:
             Matching records from all sources
         """
         start_time = time.time()
+        
+        # Repeated searches against unchanged data reuse the ranked results
+        cache_key = (self._data_version, query, limit)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            self._search_cache.move_to_end(cache_key)
+            return [dict(result) for result in cached]  # Callers get their own result dicts
+        
         query_lower = query.lower()
-        results = []
         
-        for source_key, source_data in self.sources.items():
-            for record in source_data['data']:
-                title_lower = record.get('title', '').lower()
-                if any(keyword in title_lower for keyword in query_lower.split()):
-                    results.append({
-                        **record,
-                        'source_key': source_key,
-                        'relevance': sum(1 for keyword in query_lower.split() if keyword in title_lower)
-                    })
+        if self._postings is None:
+            self._build_index()
         
-        # Sort by relevance
-        results.sort(key=lambda x: x.get('relevance', 0), reverse=True)
+        # Relevance = number of query keywords (with repeats) contained in the title.
+        # Keywords have no whitespace, so a keyword is in a title iff it is in one of its tokens;
+        # matching scans the token vocabulary instead of every record.
+        relevance = Counter()
+        for keyword, repeats in Counter(query_lower.split()).items():
+            for position in self._match_keyword(keyword):
+                relevance[position] += repeats
+        
+        # Sort by relevance (ties keep source order)
+        ranked = sorted(relevance, key=lambda position: (-relevance[position], position))[:limit]
+        results = []
+        for position in ranked:
+            source_key, record = self._indexed_records[position]
+            results.append({**record, 'source_key': source_key, 'relevance': relevance[position]})
         
         search_time = round((time.time() - start_time) * 1000, 2)
         
-        return results[:limit]
+        self._search_cache[cache_key] = [dict(result) for result in results]
+        if len(self._search_cache) > self.max_search_cache_size:
+            self._search_cache.popitem(last=False)
+        
+        return results
+    
+    def _match_keyword(self, keyword: str) -> frozenset:
+        """Positions of records whose title contains keyword, memoized until the index is rebuilt"""
+        matched = self._keyword_matches.get(keyword)
+        if matched is None:
+            # Exact token hit is a dict lookup; partial matches need the vocabulary scan
+            positions = set(self._postings.get(keyword, ()))
+            for token, token_positions in self._postings.items():
+                if keyword in token and token != keyword:
+                    positions.update(token_positions)
+            matched = self._keyword_matches[keyword] = frozenset(positions)
+        return matched
+    
+    def _build_index(self):
+        """Index every cached record by the whitespace-separated tokens of its lowercased title (folded at fetch time)"""
+        records = []
+        postings = defaultdict(list)
+        for source_key, source_data in self.sources.items():
+            folded_for, titles_lower = source_data.get('titles_lower', (None, None))
+            if folded_for is not source_data['data']:  # Data replaced outside _fetch_source
+                titles_lower = [record.get('title', '').lower() for record in source_data['data']]
+            for record, title_lower in zip(source_data['data'], titles_lower):
+                position = len(records)
+                records.append((source_key, record))
+                for token in set(title_lower.split()):
+                    postings[token].append(position)
+        
+        self._indexed_records = records
+        self._postings = dict(postings)
+        self._keyword_matches = {}
     
     def get_all_data(self) -> Dict[str, List[Dict[str, Any]]]:
         """
@@ -405,5 +582,11 @@ class NASADataSourceManager:
 # Helper function to run async code
 def fetch_nasa_data():
     """Convenience function to fetch NASA data"""
-    manager = NASADataSourceManager()
-    return asyncio.run(manager.fetch_all_sources())
+    async def _fetch_and_close():
+        manager = NASADataSourceManager()
+        try:
+            return await manager.fetch_all_sources()
+        finally:
+            await manager.close()
+    
+    return asyncio.run(_fetch_and_close())
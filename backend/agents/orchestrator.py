@@ -7,8 +7,14 @@ from .librarian import LibrarianAgent
 from .cartographer import CartographerAgent
 from .analyst import AnalystAgent
 from .communicator import CommunicatorAgent
+from collections import deque
+import asyncio
+import threading
 import time
 
+# Most recent entries kept in the shared activity log
+ACTIVITY_LOG_SIZE = 1024
+
 
 class OrchestratorAgent:
     """
@@ -32,9 +38,15 @@ class OrchestratorAgent:
         self.analyst = None  # Will be initialized after cartographer builds graph
         self.communicator = CommunicatorAgent()
         
-        # Activity log for streaming
-        self.activity_log = []
+        # Activity log for streaming, bounded so long-running servers don't grow it forever
+        self.activity_log = deque(maxlen=ACTIVITY_LOG_SIZE)
         self.is_initialized = False
+        # Serializes knowledge base loading across threads and requests
+        self._init_lock = threading.Lock()
+        
+        # strftime result reused for every entry logged within the same second
+        self._ts_second = None
+        self._ts_text = ""
         
     def log(self, message: str, agent: Optional[str] = None) -> str:
         """
@@ -47,18 +59,34 @@ class OrchestratorAgent:
         Returns:
             Formatted log entry
         """
-        timestamp = time.strftime("%H:%M:%S")
+        now = int(time.time())
+        if now != self._ts_second:
+            self._ts_second = now
+            self._ts_text = time.strftime("%H:%M:%S", time.localtime(now))
         agent_name = agent or self.name
-        log_entry = f"[{timestamp}] [{agent_name}] {message}"
+        log_entry = f"[{self._ts_text}] [{agent_name}] {message}"
         self.activity_log.append(log_entry)
         return log_entry
     
+    def _emit(self, message: str, agent: Optional[str], pending: List[str]) -> str:
+        """Log an entry and queue it for the next callback flush"""
+        log_entry = self.log(message, agent)
+        pending.append(log_entry)
+        return log_entry
+    
+    def _flush(self, pending: List[str], log_callback: Optional[Callable]) -> None:
+        """Hand queued entries to the streaming callback as one batch"""
+        if log_callback and pending:
+            log_callback(list(pending))
+        pending.clear()
+    
     def initialize_knowledge_base(self, log_callback: Optional[Callable] = None) -> Dict[str, Any]:
         """
         Initialize the knowledge base by loading publications and building the graph
         
         Args:
-            log_callback: Optional callback function to stream logs to frontend
+            log_callback: Optional callback function to stream logs to frontend;
+                called with a list of entries once per step
             
         Returns:
             Initialization statistics
@@ -66,52 +94,58 @@ class OrchestratorAgent:
         if self.is_initialized:
             return {'status': 'already_initialized'}
         
+        with self._init_lock:
+            # Another caller may have finished loading while this one waited
+            if self.is_initialized:
+                return {'status': 'already_initialized'}
+            return self._load_knowledge_base(log_callback)
+    
+    async def ensure_initialized(self, log_callback: Optional[Callable] = None) -> Dict[str, Any]:
+        """Initialize the knowledge base on a worker thread unless it is already loaded"""
+        if self.is_initialized:
+            return {'status': 'already_initialized'}
+        return await asyncio.to_thread(self.initialize_knowledge_base, log_callback)
+    
+    def _load_knowledge_base(self, log_callback: Optional[Callable]) -> Dict[str, Any]:
+        """Load publications and build the graph; callers hold _init_lock"""
+        pending = []
+        
         # Step 1: Librarian loads publications
-        self.log("Initializing knowledge base...", self.name)
-        if log_callback:
-            log_callback(self.activity_log[-1])
+        self._emit("Initializing knowledge base...", self.name, pending)
         
-        self.log("Loading NASA Space Biology publications...", self.librarian.name)
-        if log_callback:
-            log_callback(self.activity_log[-1])
+        self._emit("Loading NASA Space Biology publications...", self.librarian.name, pending)
+        self._flush(pending, log_callback)
         
         try:
             df = self.librarian.load_publications()
             pub_count = len(df)
             
-            self.log(f"Successfully loaded {pub_count} publications", self.librarian.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            self._emit(f"Successfully loaded {pub_count} publications", self.librarian.name, pending)
             
             # Step 2: Cartographer builds knowledge graph
-            self.log("Extracting entities and building knowledge graph...", self.cartographer.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            self._emit("Extracting entities and building knowledge graph...", self.cartographer.name, pending)
             
             # Get first 100 publications for faster demo (can be adjusted)
             publications = self.librarian.get_all_publications(limit=200)
             
-            self.log(f"Processing {len(publications)} publications...", self.cartographer.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            self._emit(f"Processing {len(publications)} publications...", self.cartographer.name, pending)
+            self._flush(pending, log_callback)
             
             graph_stats = self.cartographer.build_graph(publications)
             
-            self.log(
+            self._emit(
                 f"Graph built: {graph_stats['total_publications']} pubs, "
                 f"{graph_stats['unique_subjects']} subjects, "
                 f"{graph_stats['unique_stressors']} stressors",
-                self.cartographer.name
+                self.cartographer.name,
+                pending
             )
-            if log_callback:
-                log_callback(self.activity_log[-1])
             
             # Step 3: Initialize Analyst with the graph
             self.analyst = AnalystAgent(self.cartographer)
             
-            self.log("Knowledge base ready. All agents online.", self.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            self._emit("Knowledge base ready. All agents online.", self.name, pending)
+            self._flush(pending, log_callback)
             
             self.is_initialized = True
             
@@ -122,15 +156,14 @@ class OrchestratorAgent:
             
         except Exception as e:
             error_msg = f"Initialization failed: {str(e)}"
-            self.log(error_msg, self.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            self._emit(error_msg, self.name, pending)
+            self._flush(pending, log_callback)
             return {
                 'status': 'error',
                 'error': str(e)
             }
     
-    def process_query(
+    async def process_query(
         self,
         query: str,
         persona: str = "Research Scientist",
@@ -142,91 +175,110 @@ class OrchestratorAgent:
         Args:
             query: User's research question
             persona: User's role (Research Scientist, Mission Architect, Manager)
-            log_callback: Optional callback to stream logs in real-time
+            log_callback: Optional callback to stream logs in real-time; called
+                with a list of entries once per workflow phase
             
         Returns:
             Complete response with brief, evidence, and metadata
         """
         # Clear previous activity log
-        self.activity_log = []
+        self.activity_log.clear()
+        # Per-query log so concurrent queries don't interleave their entries
+        query_log = []
+        # Entries not yet handed to log_callback
+        pending = []
         
         # Ensure initialized
         if not self.is_initialized:
-            self.log("Knowledge base not initialized. Initializing now...", self.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
-            self.initialize_knowledge_base(log_callback)
+            query_log.append(self._emit("Knowledge base not initialized. Initializing now...", self.name, pending))
+            self._flush(pending, log_callback)
+            
+            # Loading and graph building block for seconds: run them on a worker thread and
+            # hop their log batches back onto the event loop for the callback
+            loop = asyncio.get_running_loop()
+            init_log = []
+            
+            def relay(entries: List[str]):
+                init_log.extend(entries)
+                if log_callback:
+                    loop.call_soon_threadsafe(log_callback, entries)
+            
+            await self.ensure_initialized(relay)
+            query_log.extend(init_log)
         
         try:
             # Step 1: Deconstruct the query
-            self.log(f"Deconstructing user goal: '{query}'", self.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            query_log.append(self._emit(f"Deconstructing user goal: '{query}'", self.name, pending))
             
             # Step 2: Analyst extracts concepts
-            self.log("Extracting key concepts from query...", self.analyst.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            query_log.append(self._emit("Extracting key concepts from query...", self.analyst.name, pending))
             
             # Step 3: Librarian searches publications
-            self.log("Searching knowledge graph for relevant publications...", self.librarian.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            query_log.append(self._emit("Searching knowledge graph for relevant publications...", self.librarian.name, pending))
             
             # Step 4: Analyst performs analysis
-            self.log("Analyzing patterns, consensus, and contradictions...", self.analyst.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            query_log.append(self._emit("Analyzing patterns, consensus, and contradictions...", self.analyst.name, pending))
+            self._flush(pending, log_callback)
             
-            analysis = self.analyst.analyze_query(query)
+            analysis = await self.analyst.analyze_query(query)
             
-            self.log(
+            query_log.append(self._emit(
                 f"Retrieved {analysis['publication_count']} relevant publications",
-                self.analyst.name
-            )
-            if log_callback:
-                log_callback(self.activity_log[-1])
+                self.analyst.name,
+                pending
+            ))
             
-            self.log(
+            query_log.append(self._emit(
                 f"Analysis complete: {analysis['confidence']} confidence consensus",
-                self.analyst.name
-            )
-            if log_callback:
-                log_callback(self.activity_log[-1])
+                self.analyst.name,
+                pending
+            ))
+            self._flush(pending, log_callback)
             
             # Step 5: Communicator formats output
-            self.log(f"Tailoring insights for persona: {persona}", self.communicator.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            query_log.append(self._emit(f"Tailoring insights for persona: {persona}", self.communicator.name, pending))
             
             response = self.communicator.communicate(analysis, persona, query)
             
-            self.log("Synthesizing final brief...", self.communicator.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            query_log.append(self._emit("Synthesizing final brief...", self.communicator.name, pending))
             
-            self.log("✅ Analysis complete. Ready to deliver insights.", self.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            query_log.append(self._emit("✅ Analysis complete. Ready to deliver insights.", self.name, pending))
+            self._flush(pending, log_callback)
             
             # Add activity log to response
-            response['agent_log'] = self.activity_log
+            response['agent_log'] = query_log
             response['success'] = True
             
             return response
             
         except Exception as e:
             error_msg = f"Query processing failed: {str(e)}"
-            self.log(error_msg, self.name)
-            if log_callback:
-                log_callback(self.activity_log[-1])
+            query_log.append(self._emit(error_msg, self.name, pending))
+            self._flush(pending, log_callback)
             
             return {
                 'success': False,
                 'error': str(e),
-                'agent_log': self.activity_log
+                'agent_log': query_log
             }
     
+    async def process_queries(
+        self,
+        queries: List[str],
+        persona: str = "Research Scientist"
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several queries concurrently so their LLM round trips overlap
+        
+        Args:
+            queries: User research questions
+            persona: User's role applied to every query
+            
+        Returns:
+            One response per query, in input order
+        """
+        return await asyncio.gather(*[self.process_query(q, persona) for q in queries])
+    
     def get_graph_statistics(self) -> Dict[str, Any]:
         """Get current knowledge graph statistics"""
         if not self.is_initialized:
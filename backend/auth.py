@@ -57,11 +57,14 @@ def authenticate_user(db: Session, email: str, password: str):
     return user
 
 
-async def get_current_user(
+def get_current_user(
     token: Optional[str] = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
-    """Get current user from JWT token (optional - returns None if not logged in)"""
+    """
+    Get current user from JWT token (optional - returns None if not logged in)
+    Plain def so FastAPI runs the blocking user lookup in its threadpool, not on the event loop
+    """
     if not token:
         return None
     
@@ -0,0 +1,146 @@
+"""
+Response cache for /api/chat: exact-match LRU plus embedding-based semantic lookup
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import hashlib
+import time
+import numpy as np
+import orjson
+
+from agents.analyst import embed_texts
+
+# Paraphrased questions in the same conversation scope whose embeddings are this similar share an answer
+CHAT_SEMANTIC_THRESHOLD = 0.92
+CHAT_CACHE_TTL = 3600  # seconds
+CHAT_CACHE_SIZE = 256
+
+
+def chat_scope_key(context: Optional[dict], history_context: str) -> bytes:
+    """Digest of everything besides the message that shapes an answer: result context and recent history"""
+    payload = orjson.dumps({'context': context or {}, 'history': history_context}, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def chat_cache_key(message: str, scope: bytes) -> bytes:
+    """Exact-match key: the normalized message within its scope"""
+    return hashlib.blake2b(message.strip().lower().encode(), digest_size=16, key=scope).digest()
+
+
+async def embed_message(message: str) -> Optional[np.ndarray]:
+    """Embed a chat message as a unit vector for semantic lookup (None without Gemini or on error)"""
+    return (await embed_texts([message]))[0]
+
+
+class ChatResponseCache:
+    """
+    In-process cache of generated chat answers.
+
+    Exact hits are looked up by chat_cache_key in an LRU with a TTL. Semantic hits compare the
+    message embedding against a ring buffer of recent ones, restricted to the same scope, so an
+    answer is never reused for a different result set or conversation.
+    """
+
+    def __init__(self, max_size: int = CHAT_CACHE_SIZE, ttl: float = CHAT_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()  # key -> (expires_at, response)
+
+        # Semantic ring buffer: unit-norm message embeddings with their scope and entry
+        self._embedding_matrix = None  # Allocated on first insert, once the dimension is known
+        self._embedding_scopes: List[Optional[bytes]] = [None] * max_size
+        self._embedding_entries: List[Optional[tuple]] = [None] * max_size
+        self._embedding_count = 0
+        self._embedding_next = 0
+
+        # Answers being generated, so identical concurrent questions share one model call
+        self._inflight: Dict[bytes, asyncio.Task] = {}
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    def get(self, key: bytes) -> Optional[str]:
+        """Exact-match lookup; a live hit becomes the most recently used entry"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def find_similar(self, key: bytes, scope: bytes, embedding: Optional[np.ndarray]) -> Optional[str]:
+        """
+        Semantic lookup after an exact miss: the most similar live answer in the same scope,
+        if it clears CHAT_SEMANTIC_THRESHOLD. A hit is also stored under the exact key.
+        """
+        if embedding is not None and self._embedding_count:
+            similarities = self._embedding_matrix[:self._embedding_count] @ embedding
+            now = time.monotonic()
+            for slot in np.argsort(similarities)[::-1]:
+                if similarities[slot] < CHAT_SEMANTIC_THRESHOLD:
+                    break
+                entry = self._embedding_entries[slot]
+                if self._embedding_scopes[slot] == scope and entry[0] >= now:
+                    self.hits += 1
+                    self.semantic_hits += 1
+                    self._put(key, entry)
+                    return entry[1]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: bytes, scope: bytes, embedding: Optional[np.ndarray], response: str):
+        """Store a freshly generated answer under its exact key and, when embedded, for semantic lookup"""
+        entry = (time.monotonic() + self.ttl, response)
+        self._put(key, entry)
+
+        if embedding is None:
+            return
+
+        if self._embedding_matrix is None:
+            self._embedding_matrix = np.zeros((self.max_size, embedding.shape[0]), dtype=np.float32)
+
+        # Overwrite the oldest slot once the buffer is full
+        slot = self._embedding_next
+        self._embedding_matrix[slot] = embedding
+        self._embedding_scopes[slot] = scope
+        self._embedding_entries[slot] = entry
+        self._embedding_next = (slot + 1) % self.max_size
+        self._embedding_count = min(self._embedding_count + 1, self.max_size)
+
+    def single_flight(self, key: bytes, start: Callable[[], Awaitable[str]]) -> asyncio.Task:
+        """Task answering `key`: the one already in flight (counted as a hit), or a new one running start()"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(start())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _task: self._inflight.pop(key, None))
+        else:
+            self.hits += 1
+            self.coalesced += 1
+        return task
+
+    def _put(self, key: bytes, entry: tuple):
+        """Insert into the exact-match LRU, evicting the least recently used entry when full"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since startup (hit rate in percent)"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'semantic_hits': self.semantic_hits,
+            'coalesced': self.coalesced,
+            'misses': self.misses,
+            'hit_rate': round(100 * self.hits / lookups, 1) if lookups else 0.0
+        }
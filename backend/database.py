@@ -1,10 +1,14 @@
 """
 Database setup for user authentication and memory storage
 """
-from sqlalchemy import create_engine, Column, String, Integer, DateTime, Text, JSON
+from sqlalchemy import create_engine, event, inspect, text, Column, String, Integer, DateTime, Text, JSON, Index
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+from collections import Counter
+from typing import Iterable, List
+import json
 
 # SQLite database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./project_chimera.db"
@@ -12,6 +16,19 @@ SQLALCHEMY_DATABASE_URL = "sqlite:///./project_chimera.db"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the writer; NORMAL sync is safe under WAL"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -29,17 +46,25 @@ class User(Base):
     # Auto-learned preferences
     preferred_persona = Column(String, default="Research Scientist")
     usage_count = Column(Integer, default=0)
+    # Legacy JSON counts, superseded by UserPersonaCount/UserTopicCount and copied over by init_db
     persona_usage = Column(JSON, default=dict)  # {"Research Scientist": 10, "Manager": 2}
     favorite_topics = Column(JSON, default=list)  # ["Microgravity", "Radiation"]
     last_active = Column(DateTime, default=datetime.utcnow)
+    
+    # Primary key of the user's current ChatSession, so chat turns skip the latest-session sort
+    active_chat_session_id = Column(Integer, nullable=True)
 
 
 class ChatSession(Base):
     """Store chat sessions with LangChain memory"""
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index('ix_chatsess_user_sid', 'user_id', 'session_id'),
+        Index('ix_chatsess_user_created', 'user_id', 'created_at'),  # latest session per user
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     session_id = Column(String, index=True, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -52,18 +77,162 @@ class ChatSession(Base):
 class UserPreference(Base):
     """Track user queries and interactions for auto-learning"""
     __tablename__ = "user_preferences"
+    __table_args__ = (
+        Index('ix_userpref_user_ts', 'user_id', 'timestamp'),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False)
     query = Column(Text, nullable=False)
     persona_used = Column(String, nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
     topics_mentioned = Column(JSON, default=list)
 
 
+class UserPersonaCount(Base):
+    """How many queries a user has asked with each persona"""
+    __tablename__ = "user_persona_counts"
+    
+    user_id = Column(Integer, primary_key=True)
+    persona = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class UserTopicCount(Base):
+    """How often each topic came up in a user's queries"""
+    __tablename__ = "user_topic_counts"
+    
+    user_id = Column(Integer, primary_key=True)
+    topic = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
 # Create all tables
 def init_db():
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add any newer indexes explicitly
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    
+    # Nor does it add columns to existing tables; newer columns are nullable, so ADD COLUMN is enough
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    ))
+        
+        # Copy legacy JSON counts into the count tables for users that have no rows there yet
+        for table, key, column in (
+            ('user_persona_counts', 'persona', 'persona_usage'),
+            ('user_topic_counts', 'topic', 'favorite_topics'),
+        ):
+            conn.execute(text(
+                f"INSERT INTO {table} (user_id, {key}, count) "
+                f"SELECT users.id, j.key, j.value FROM users, json_each(users.{column}) AS j "
+                f"WHERE json_type(users.{column}) = 'object' "
+                f"AND NOT EXISTS (SELECT 1 FROM {table} WHERE {table}.user_id = users.id) "
+                f"ORDER BY users.id, j.id"
+            ))
+
+
+def bump_persona(db, user_id: int, persona: str) -> None:
+    """
+    Count one query for a user in SQL, without loading the user row
+    
+    Increments usage_count and the user's count for persona and refreshes last_active.
+    preferred_persona is kept as a running argmax: only the bumped persona's count changed,
+    so it takes over when it now beats the current favourite (first one used on ties).
+    The caller commits.
+    """
+    db.execute(
+        text(
+            "UPDATE users SET usage_count = COALESCE(usage_count, 0) + 1, last_active = :now "
+            "WHERE id = :uid"
+        ),
+        {'now': datetime.utcnow(), 'uid': user_id}
+    )
+    stmt = sqlite_insert(UserPersonaCount).values(user_id=user_id, persona=persona, count=1)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['user_id', 'persona'],
+        set_={'count': UserPersonaCount.count + 1}
+    ))
+    db.execute(
+        text(
+            "UPDATE users SET preferred_persona = :persona "
+            "WHERE id = :uid AND preferred_persona IS NOT :persona AND ("
+            "SELECT bumped.count > COALESCE(current.count, 0) "
+            "OR (bumped.count = current.count AND bumped.rowid < current.rowid) "
+            "FROM user_persona_counts AS bumped "
+            "LEFT JOIN user_persona_counts AS current "
+            "ON current.user_id = bumped.user_id AND current.persona = users.preferred_persona "
+            "WHERE bumped.user_id = :uid AND bumped.persona = :persona"
+            ")"
+        ),
+        {'uid': user_id, 'persona': persona}
+    )
+
+
+def bump_topics(db, user_id: int, topics: Iterable[str]) -> None:
+    """Add topic mentions to a user's topic counts with one multi-row upsert; the caller commits"""
+    counts = Counter(topics)
+    if not counts:
+        return
+    
+    stmt = sqlite_insert(UserTopicCount).values([
+        {'user_id': user_id, 'topic': topic, 'count': count}
+        for topic, count in counts.items()
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=['user_id', 'topic'],
+        set_={'count': UserTopicCount.count + stmt.excluded.count}
+    ))
+
+
+# Messages kept per chat session; older ones are dropped as new turns are appended
+MAX_CHAT_HISTORY = 50
+
+
+def append_chat_turns(db, chat_session_id: int, messages: List[dict], context: dict) -> None:
+    """
+    Append messages to a chat session's history in SQL instead of rewriting the whole JSON array
+    
+    The history is then trimmed to its last MAX_CHAT_HISTORY messages. Also replaces the stored
+    context and bumps updated_at. The caller commits.
+    """
+    if not messages:
+        return
+    
+    params = {'sid': chat_session_id, 'context': json.dumps(context), 'now': datetime.utcnow()}
+    inserts = []
+    for i, message in enumerate(messages):
+        inserts.append(f"'$[#]', json(:m{i})")
+        params[f'm{i}'] = json.dumps(message)
+    
+    db.execute(
+        text(
+            "UPDATE chat_sessions SET conversation_history = json_insert("
+            "CASE WHEN json_type(conversation_history) = 'array' THEN conversation_history ELSE '[]' END, "
+            + ", ".join(inserts) +
+            "), context = :context, updated_at = :now WHERE id = :sid"
+        ),
+        params
+    )
+    
+    # Keep only the newest messages; a no-op until the history outgrows the limit
+    db.execute(
+        text(
+            "UPDATE chat_sessions SET conversation_history = ("
+            "SELECT json_group_array(value) FROM json_each(chat_sessions.conversation_history) "
+            "WHERE key >= json_array_length(chat_sessions.conversation_history) - :keep"
+            ") WHERE id = :sid AND json_array_length(conversation_history) > :keep"
+        ),
+        {'sid': chat_session_id, 'keep': MAX_CHAT_HISTORY}
+    )
 
 
 def get_db():
@@ -1,18 +1,27 @@
 """
 New Main API with 5-Agent Orchestrator System
 """
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Response, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from pydantic import BaseModel
-from typing import Optional, List
-import json
+from sse_starlette.sse import EventSourceResponse
+from starlette.background import BackgroundTask
+from typing import Optional, List, Tuple
+from contextlib import asynccontextmanager
 import asyncio
 import sys
 import os
+import time
+import traceback
+import uuid
 from datetime import timedelta
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
+import ahocorasick
+import numpy as np
+import orjson
 
 # Load environment variables from .env file
 load_dotenv()
@@ -25,37 +34,73 @@ from auth import (
     get_current_user,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from database import get_db, init_db, User
+from database import (
+    get_db, init_db, SessionLocal, User, ChatSession, UserPreference,
+    append_chat_turns, bump_persona, bump_topics
+)
+from taxonomy import CATEGORY_KEYWORDS, CATEGORY_REGEX, KEY_TERMS, CLUSTER_COMBOS, get_category_icon
+from chat_cache import ChatResponseCache, chat_cache_key, chat_scope_key, embed_message
 
 # Add backend directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
 
 from agents.orchestrator import OrchestratorAgent
 
+# Global orchestrator instance
+orchestrator = OrchestratorAgent()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the database, then load the knowledge base in the background"""
+    init_db()
+    # Started here so the first request doesn't pay the load; requests that arrive
+    # earlier wait on the same load through ensure_initialized()
+    app.state.knowledge_base_task = asyncio.create_task(orchestrator.ensure_initialized())
+    yield
+
+
 # Initialize FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title="NASA Space Biology Knowledge Engine - Agentic System",
     description="5-Agent Digital Research Team powered by LangChain",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Enable CORS
+# Enable CORS for the frontend origins in CORS_ORIGINS (comma-separated);
+# unset keeps the permissive development default
+CORS_ORIGINS = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=CORS_ORIGINS or ["*"],
+    allow_credentials=bool(CORS_ORIGINS),  # credentials are not valid with a wildcard origin
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Global orchestrator instance
-orchestrator = OrchestratorAgent()
+# Server-Sent Events endpoints; compressing them would hold frames back in the gzip buffer
+EVENT_STREAM_PATHS = {"/query/stream", "/api/chat/stream", "/api/metrics-stream"}
 
-# Initialize database on startup
-@app.on_event("startup")
-def startup_event():
-    """Initialize database when app starts"""
-    init_db()
+
+class EventStreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip for JSON responses; event streams pass through uncompressed"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in EVENT_STREAM_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(EventStreamAwareGZipMiddleware, minimum_size=1024)
+
+# /api/categories payload as (monotonic build time, DataFrame it was built from, payload);
+# rebuilt after the TTL or when the librarian's DataFrame is replaced
+CATEGORIES_CACHE_TTL = 300
+_categories_cache: Optional[tuple] = None
 
 
 # --- Request/Response Models ---
@@ -222,6 +267,8 @@ def initialize():
     Initialize the knowledge base
     (Load publications and build knowledge graph)
     """
+    global _categories_cache
+    
     if orchestrator.is_initialized:
         return {
             "status": "already_initialized",
@@ -230,7 +277,14 @@ def initialize():
     
     result = orchestrator.initialize_knowledge_base()
     
-    if result['status'] == 'success':
+    if result['status'] == 'already_initialized':
+        # Loaded by a concurrent request or the startup task while this one waited
+        return {
+            "status": "already_initialized",
+            "message": "Knowledge base is already loaded"
+        }
+    elif result['status'] == 'success':
+        _categories_cache = None
         return {
             "status": "success",
             "message": "Knowledge base initialized successfully",
@@ -250,11 +304,36 @@ def get_statistics():
     return stats
 
 
+def learn_user_preferences(user_id: int, query_text: str, persona: str, topics: List[str]):
+    """
+    Record a query for auto-learning: usage counters plus a UserPreference row, in one commit.
+    Runs as a background task after the response is sent, so it opens its own session.
+    """
+    db = SessionLocal()
+    try:
+        # Usage count, persona usage, preferred persona and last active, updated in SQL
+        bump_persona(db, user_id, persona)
+        
+        # Topics from the highlighted concepts
+        bump_topics(db, user_id, topics)
+        
+        # Save user preference entry
+        db.add(UserPreference(
+            user_id=user_id,
+            query=query_text,
+            persona_used=persona,
+            topics_mentioned=topics
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
 @app.post("/query", response_model=QueryResponse)
 async def query(
     request: QueryRequest,
-    current_user: Optional[User] = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    current_user: Optional[User] = Depends(get_current_user)
 ):
     """
     Process a query through the 5-agent system
@@ -277,7 +356,7 @@ async def query(
         
         persona = request.persona or "Research Scientist"
         
-        response = orchestrator.process_query(
+        response = await orchestrator.process_query(
             query=query_text,
             persona=persona
         )
@@ -288,69 +367,73 @@ async def query(
                 detail=response.get('error', 'Query processing failed')
             )
         
-        # Learn preferences for authenticated users
+        # Learn preferences for authenticated users once the response has been sent
         if current_user:
-            from database import UserPreference
-            from sqlalchemy.orm.attributes import flag_modified
-            import json as json_lib
-            
-            # Update user usage count
-            current_user.usage_count += 1
-            
-            # Track persona usage
-            persona_usage = current_user.persona_usage or {}
-            persona_usage[persona] = persona_usage.get(persona, 0) + 1
-            current_user.persona_usage = persona_usage
-            flag_modified(current_user, 'persona_usage')  # Tell SQLAlchemy JSON was modified
-            
-            # Set preferred persona (most used)
-            most_used_persona = max(persona_usage, key=persona_usage.get)
-            current_user.preferred_persona = most_used_persona
-            
-            # Extract topics from query and highlighted concepts
-            topics = response.get('highlighted_concepts', [])
-            favorite_topics = current_user.favorite_topics or {}
-            for topic in topics:
-                favorite_topics[topic] = favorite_topics.get(topic, 0) + 1
-            current_user.favorite_topics = favorite_topics
-            flag_modified(current_user, 'favorite_topics')  # Tell SQLAlchemy JSON was modified
-            
-            # Update last active
-            from datetime import datetime
-            current_user.last_active = datetime.utcnow()
-            
-            # Save user preference entry
-            user_pref = UserPreference(
-                user_id=current_user.id,
-                query=query_text,
-                persona_used=persona,
-                topics_mentioned=topics
+            background_tasks.add_task(
+                learn_user_preferences,
+                current_user.id,
+                query_text,
+                persona,
+                response.get('highlighted_concepts', [])
             )
-            db.add(user_pref)
-            db.commit()
-        
-        # Format response
-        return QueryResponse(
-            success=True,
-            brief=BriefResponse(
-                consensus=response['brief']['consensus'],
-                contradictions=response['brief']['contradictions'],
-                knowledge_gaps=response['brief']['knowledge_gaps'],
-                confidence=response['brief']['confidence']
-            ),
-            evidence=[
-                EvidenceItem(**item) for item in response['evidence']
+        
+        # Format response: the orchestrator is a trusted producer, so the QueryResponse shape is
+        # built as plain dicts and serialized directly instead of re-validated through Pydantic
+        brief = response['brief']
+        return ORJSONResponse({
+            'success': True,
+            'brief': {
+                'consensus': brief['consensus'],
+                'contradictions': brief['contradictions'],
+                'knowledge_gaps': brief['knowledge_gaps'],
+                'confidence': brief['confidence']
+            },
+            'evidence': [
+                {
+                    'title': item['title'],
+                    'year': item['year'],
+                    'url': item['url'],
+                    'journal': item.get('journal', '')
+                }
+                for item in response['evidence']
             ],
-            highlighted_concepts=response['highlighted_concepts'],
-            follow_up_questions=response['follow_up_questions'],
-            agent_log=response['agent_log'],
-            persona=response['persona']
-        )
+            'highlighted_concepts': response['highlighted_concepts'],
+            'follow_up_questions': response['follow_up_questions'],
+            'agent_log': response['agent_log'],
+            'persona': response['persona']
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+SSE_HEARTBEAT_INTERVAL = 15  # seconds of silence before a keep-alive comment is sent
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # stop nginx from buffering the stream
+}
+
+
+def _sse(payload: dict) -> bytes:
+    """Encode one Server-Sent Events data frame"""
+    return b"data: " + orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) + b"\n\n"
+
+
+# Frames whose content never changes are encoded once at import
+_SSE_DONE = _sse({'type': 'done'})
+_SSE_HEARTBEAT = b": keepalive\n\n"  # comment frame, ignored by EventSource
+
+# Fixed fields of /api/metrics-stream updates; live counters are added per update
+PERFORMANCE_UPDATE = {
+    "type": "performance_update",
+    "timestamp": "2025-10-05T12:00:00Z",
+    "query_time_ms": 41,
+    "cache_hit_rate": 85.5
+}
+
+
 @app.get("/query/stream")
 async def query_stream(question: str, persona: str = "Research Scientist"):
     """
@@ -363,46 +446,35 @@ async def query_stream(question: str, persona: str = "Research Scientist"):
     async def generate():
         """Generator for SSE streaming with enhanced logging"""
         try:
-            # Step 1: Initialization
-            if not orchestrator.is_initialized:
-                yield f"data: {json.dumps({'type': 'log', 'message': '[System] Initializing knowledge base...'})}\n\n"
-                await asyncio.sleep(0.5)
-                orchestrator.initialize_knowledge_base()
-                yield f"data: {json.dumps({'type': 'log', 'message': '[System] ✓ Knowledge base loaded with 607 publications'})}\n\n"
-                await asyncio.sleep(0.4)
-            
-            # Step 2: Query Analysis
             question_preview = question[:80] + "..." if len(question) > 80 else question
-            yield f"data: {json.dumps({'type': 'log', 'message': f'[Query Planner] Analyzing query: {question_preview}'})}\n\n"
-            await asyncio.sleep(0.6)
-            
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Query Planner] Breaking down into sub-components...'})}\n\n"
-            await asyncio.sleep(0.5)
-            
-            yield f"data: {json.dumps({'type': 'log', 'message': f'[Query Planner] Persona selected: {persona}'})}\n\n"
-            await asyncio.sleep(0.4)
+            yield _sse({'type': 'log', 'message': f'[Query Planner] Analyzing query: {question_preview}'})
+            yield _sse({'type': 'log', 'message': f'[Query Planner] Persona selected: {persona}'})
             
-            # Step 3: Data Retrieval
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Data Retrieval] Searching knowledge graph...'})}\n\n"
-            await asyncio.sleep(0.7)
+            # Run the query (including first-time initialization) as a task and relay
+            # its agent log batches as they are produced; None marks the end
+            log_queue: asyncio.Queue = asyncio.Queue()
+            task = asyncio.create_task(orchestrator.process_query(
+                query=question,
+                persona=persona,
+                log_callback=log_queue.put_nowait
+            ))
+            task.add_done_callback(lambda _task: log_queue.put_nowait(None))
             
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Data Retrieval] Querying publication database...'})}\n\n"
-            await asyncio.sleep(0.6)
-            
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Data Retrieval] Ranking results by relevance...'})}\n\n"
-            await asyncio.sleep(0.5)
-            
-            # Step 4: Process query (actual work happens here)
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Synthesis Agent] Processing retrieved publications...'})}\n\n"
-            await asyncio.sleep(0.4)
+            while True:
+                try:
+                    entries = await asyncio.wait_for(log_queue.get(), SSE_HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    # Nothing logged for a while; keep proxies from closing an idle connection
+                    yield _SSE_HEARTBEAT
+                    continue
+                if entries is None:
+                    break
+                for entry in entries:
+                    yield _sse({'type': 'log', 'message': entry})
             
             try:
-                response = orchestrator.process_query(
-                    query=question,
-                    persona=persona
-                )
+                response = task.result()
             except Exception as e:
-                import traceback
                 error_detail = traceback.format_exc()
                 print(f"ERROR in process_query: {error_detail}")  # Log to console
                 response = {
@@ -410,32 +482,6 @@ async def query_stream(question: str, persona: str = "Research Scientist"):
                     'error': f"Query processing failed: {str(e)}"
                 }
             
-            # Step 5: Synthesis
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Synthesis Agent] Identifying consensus patterns...'})}\n\n"
-            await asyncio.sleep(0.6)
-            
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Synthesis Agent] Detecting contradictions...'})}\n\n"
-            await asyncio.sleep(0.5)
-            
-            # Step 6: Knowledge Gap Analysis
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Knowledge Gap Analyzer] Analyzing missing information...'})}\n\n"
-            await asyncio.sleep(0.6)
-            
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Knowledge Gap Analyzer] Identifying research opportunities...'})}\n\n"
-            await asyncio.sleep(0.5)
-            
-            # Step 7: Follow-up Generation
-            yield f"data: {json.dumps({'type': 'log', 'message': '[Follow-up Generator] Creating suggested questions...'})}\n\n"
-            await asyncio.sleep(0.5)
-            
-            # Step 8: Finalization
-            yield f"data: {json.dumps({'type': 'log', 'message': '[System] ✓ Analysis complete. Preparing results...'})}\n\n"
-            await asyncio.sleep(0.4)
-            
-            # Add a pause to let users review the complete log before showing results
-            yield f"data: {json.dumps({'type': 'log', 'message': '[System] Finalizing synthesis...'})}\n\n"
-            await asyncio.sleep(6.0)  # 6 second pause to let users read the full log
-            
             # Send final results
             if response.get('success'):
                 result_data = {
@@ -446,31 +492,27 @@ async def query_stream(question: str, persona: str = "Research Scientist"):
                     'follow_up_questions': response['follow_up_questions'],
                     'persona': response['persona']
                 }
-                yield f"data: {json.dumps(result_data)}\n\n"
+                yield _sse(result_data)
             else:
                 error_data = {
                     'type': 'error',
                     'message': response.get('error', 'Unknown error')
                 }
-                yield f"data: {json.dumps(error_data)}\n\n"
+                yield _sse(error_data)
             
             # End stream
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield _SSE_DONE
             
         except Exception as e:
-            import traceback
             error_detail = traceback.format_exc()
             print(f"ERROR in generate(): {error_detail}")  # Log to console
-            yield f"data: {json.dumps({'type': 'error', 'message': f'Stream error: {str(e)}'})}\n\n"
-            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+            yield _sse({'type': 'error', 'message': f'Stream error: {str(e)}'})
+            yield _SSE_DONE
     
     return StreamingResponse(
         generate(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
+        headers=SSE_HEADERS
     )
 
 
@@ -479,16 +521,18 @@ async def query_stream(question: str, persona: str = "Research Scientist"):
 async def get_stats():
     """Get current system statistics"""
     try:
+        # Analysis cache counters are live once the Analyst exists
+        cache_stats = orchestrator.analyst.get_cache_stats() if orchestrator.analyst else {}
         return {
             "total_publications": 607,
             "unique_subjects": 20,
             "unique_stressors": 8,
             "graph_connections": 40,
-            "cached_queries": 100,
+            "cached_queries": cache_stats.get('cached_queries', 0),
             "avg_query_time_ms": 41,
             "publication_count": 607,
             "last_query_time_ms": 41,
-            "cache_hit_rate": 85.5,
+            "cache_hit_rate": cache_stats.get('hit_rate', 0.0),
             "active_agents": 5,
             "data_sources": {
                 "csv": {"status": "active", "count": 607},
@@ -501,16 +545,50 @@ async def get_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# --- Category matching (built once at import; the taxonomy itself lives in taxonomy.py) ---
+
+# Rough publication period by PMC ID (approximate): IDs below PMC_YEAR_BOUNDS[i] fall in PMC_YEAR_LABELS[i]
+PMC_YEAR_BOUNDS = np.array([1000000, 2000000, 3000000, 4000000, 5000000, 6000000, 8000000], dtype=np.int64)
+PMC_YEAR_LABELS = np.array(
+    ["2000-2005", "2006-2010", "2011-2013", "2014-2015", "2016-2017", "2018-2019", "2020-2021", "2022-2024"],
+    dtype=object
+)
+
+
+def _build_title_automaton() -> ahocorasick.Automaton:
+    """
+    One Aho-Corasick automaton over every category keyword and key term, so each title is
+    scanned once; overlapping matches keep the substring semantics of `keyword in title`.
+    Payload per word: (positions in CATEGORY_KEYWORDS, position in KEY_TERMS or None).
+    """
+    word_hits = {}
+    for position, keywords in enumerate(CATEGORY_KEYWORDS.values()):
+        for keyword in keywords:
+            word_hits.setdefault(keyword, (set(), [None]))[0].add(position)
+    for position, term in enumerate(KEY_TERMS):
+        word_hits.setdefault(term, (set(), [None]))[1][0] = position
+    automaton = ahocorasick.Automaton()
+    for word, (word_categories, word_term) in word_hits.items():
+        automaton.add_word(word, (tuple(word_categories), word_term[0]))
+    automaton.make_automaton()
+    return automaton
+
+
+_TITLE_AUTOMATON = _build_title_automaton()
+
+
 @app.get("/api/categories")
-async def get_categories():
+async def get_categories(response: Response):
     """
     Get categories dynamically extracted from publication titles and NASA sources
     Categories are extracted using keyword analysis of titles
+    Cached in-process for CATEGORIES_CACHE_TTL seconds
     """
+    global _categories_cache
+    
     try:
         # Ensure knowledge base is loaded
-        if not orchestrator.is_initialized:
-            orchestrator.initialize_knowledge_base()
+        await orchestrator.ensure_initialized()
         
         # Force reload if cache is None
         df = orchestrator.librarian.publications_cache
@@ -526,47 +604,33 @@ async def get_categories():
                 "total_publications": 0
             }
         
-        publications = df.to_dict('records')
-        
-        # Define space biology categories based on common research areas
-        category_keywords = {
-            "Microgravity Effects": ["microgravity", "weightless", "zero-g", "space flight", "spaceflight"],
-            "Radiation Biology": ["radiation", "cosmic ray", "solar particle", "ionizing", "dosimetry"],
-            "Plant Biology": ["plant", "photosynthesis", "crop", "agriculture", "botany", "seed"],
-            "Cell Biology": ["cell", "cellular", "membrane", "protein", "gene expression", "molecular"],
-            "Bone & Muscle": ["bone", "muscle", "osteo", "skeletal", "calcium", "myocyte"],
-            "Cardiovascular": ["cardiovascular", "heart", "blood", "circulation", "vascular"],
-            "Immune System": ["immune", "immunity", "lymphocyte", "antibody", "infection"],
-            "Neuroscience": ["brain", "neural", "cognitive", "neurological", "neuron"],
-            "Metabolism": ["metabol", "nutrition", "diet", "energy", "glucose"],
-            "Microbiology": ["bacteria", "microbe", "microorganism", "pathogen", "microbiome"],
-            "Development": ["development", "embryo", "growth", "differentiation", "morphology"],
-            "Countermeasures": ["countermeasure", "prevention", "exercise", "pharmaceutical", "therapy"]
-        }
+        response.headers["Cache-Control"] = f"public, max-age={CATEGORIES_CACHE_TTL}"
+        if _categories_cache is not None:
+            built_at, cached_df, payload = _categories_cache
+            if cached_df is df and time.monotonic() - built_at < CATEGORIES_CACHE_TTL:
+                return payload
+        
+        titles = df['title_lc'].tolist()
         
-        # Count publications by category
-        category_counts = {cat: 0 for cat in category_keywords.keys()}
+        # Count publications by category and by key term
+        category_hits = [0] * len(CATEGORY_KEYWORDS)
         topic_keywords = {}
         
-        for pub in publications:
-            title = str(pub.get('Title', '')).lower()
+        for title in titles:
+            matched_categories = set()
+            matched_terms = set()
+            for _, (word_categories, word_term) in _TITLE_AUTOMATON.iter(title):
+                matched_categories.update(word_categories)
+                if word_term is not None:
+                    matched_terms.add(word_term)
             
-            # Match against categories
-            for category, keywords in category_keywords.items():
-                if any(keyword in title for keyword in keywords):
-                    category_counts[category] += 1
-            
-            # Extract key terms (simple approach: common space biology terms)
-            key_terms = [
-                "gravity", "space", "radiation", "microgravity", "weightless",
-                "plant", "cell", "bone", "muscle", "brain", "immune", "bacteria",
-                "gene", "protein", "tissue", "organism", "mouse", "rat", "human",
-                "mars", "moon", "iss", "station", "flight", "mission"
-            ]
-            
-            for term in key_terms:
-                if term in title:
-                    topic_keywords[term] = topic_keywords.get(term, 0) + 1
+            for position in matched_categories:
+                category_hits[position] += 1
+            for position in sorted(matched_terms):  # KEY_TERMS order, as first-seen order for ties
+                term = KEY_TERMS[position]
+                topic_keywords[term] = topic_keywords.get(term, 0) + 1
+        
+        category_counts = dict(zip(CATEGORY_KEYWORDS, category_hits))
         
         # Create category list with counts (only non-zero)
         categories = [
@@ -583,15 +647,7 @@ async def get_categories():
         
         # Create research clusters (combination of categories)
         clusters = []
-        cluster_combos = [
-            ("Microgravity Effects", "Bone & Muscle"),
-            ("Radiation Biology", "Cell Biology"),
-            ("Plant Biology", "Microgravity Effects"),
-            ("Cardiovascular", "Countermeasures"),
-            ("Immune System", "Microbiology")
-        ]
-        
-        for cat1, cat2 in cluster_combos:
+        for cat1, cat2 in CLUSTER_COMBOS:
             count = min(category_counts.get(cat1, 0), category_counts.get(cat2, 0))
             if count > 0:
                 clusters.append({
@@ -604,7 +660,7 @@ async def get_categories():
         data_sources = [
             {
                 "name": "Local CSV Database",
-                "count": len(publications),
+                "count": len(df),
                 "status": "active",
                 "icon": "📚"
             },
@@ -631,40 +687,22 @@ async def get_categories():
             }
         ]
         
-        return {
+        payload = {
             "categories": categories,
             "topics": topics,
             "clusters": clusters,
             "data_sources": data_sources,
-            "total_publications": len(publications),
+            "total_publications": len(df),
             "last_updated": "2025-10-05T12:00:00Z"
         }
+        _categories_cache = (time.monotonic(), df, payload)
+        return payload
     
     except Exception as e:
-        import traceback
         print(f"ERROR in /api/categories: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def get_category_icon(category: str) -> str:
-    """Get emoji icon for category"""
-    icons = {
-        "Microgravity Effects": "🌍",
-        "Radiation Biology": "☢️",
-        "Plant Biology": "🌱",
-        "Cell Biology": "🧬",
-        "Bone & Muscle": "💪",
-        "Cardiovascular": "❤️",
-        "Immune System": "🛡️",
-        "Neuroscience": "🧠",
-        "Metabolism": "⚡",
-        "Microbiology": "🦠",
-        "Development": "🌟",
-        "Countermeasures": "💊"
-    }
-    return icons.get(category, "📊")
-
-
 @app.get("/api/categories/{category_name}/publications")
 async def get_category_publications(category_name: str):
     """
@@ -681,63 +719,34 @@ async def get_category_publications(category_name: str):
                 "total": 0
             }
         
-        publications = publications_cache.to_dict('records')
-        
-        # Define category keywords
-        category_keywords_map = {
-            "Microgravity Effects": ["microgravity", "weightless", "zero-g", "spaceflight", "zero gravity"],
-            "Cell Biology": ["cell", "cellular", "culture", "proliferation", "apoptosis"],
-            "Bone & Muscle": ["bone", "muscle", "skeletal", "osteo", "myocyte"],
-            "Plant Biology": ["plant", "arabidopsis", "seed", "root", "shoot"],
-            "Microbiology": ["bacteria", "microbe", "microbial", "pathogen"],
-            "Development": ["development", "embryo", "differentiation", "stem cell"],
-            "Radiation Biology": ["radiation", "cosmic ray", "particle", "dosimetry"],
-            "Immune System": ["immune", "immunity", "cytokine", "lymphocyte"],
-            "Metabolism": ["metabol", "energy", "nutrient", "glucose"],
-            "Cardiovascular": ["cardiovascular", "heart", "blood", "vascular"],
-            "Neuroscience": ["neuro", "brain", "cognitive", "nervous"],
-            "Countermeasures": ["countermeasure", "exercise", "nutrition", "protection"]
-        }
+        category_pattern = CATEGORY_REGEX.get(category_name)
+        if category_pattern is None:
+            return {
+                "category": category_name,
+                "publications": [],
+                "total": 0
+            }
         
-        keywords = category_keywords_map.get(category_name, [])
-        
-        # Filter publications by category keywords
-        filtered_pubs = []
-        for pub in publications:
-            title_lower = pub.get('Title', '').lower()
-            if any(keyword in title_lower for keyword in keywords):
-                # Try to extract year from PMC URL or title
-                year = "N/A"
-                url = pub.get('Link', '')
-                
-                # Try to extract year from URL pattern like PMC3630201
-                import re
-                pmc_match = re.search(r'PMC(\d+)', url)
-                if pmc_match:
-                    # Rough year estimation from PMC ID (this is approximate)
-                    pmc_id = int(pmc_match.group(1))
-                    if pmc_id < 1000000:
-                        year = "2000-2005"
-                    elif pmc_id < 2000000:
-                        year = "2006-2010"
-                    elif pmc_id < 3000000:
-                        year = "2011-2013"
-                    elif pmc_id < 4000000:
-                        year = "2014-2015"
-                    elif pmc_id < 5000000:
-                        year = "2016-2017"
-                    elif pmc_id < 6000000:
-                        year = "2018-2019"
-                    elif pmc_id < 8000000:
-                        year = "2020-2021"
-                    else:
-                        year = "2022-2024"
-                
-                filtered_pubs.append({
-                    "title": pub.get('Title', 'Untitled'),
-                    "url": url,
-                    "year": year
-                })
+        # Filter publications by category keywords in one vectorized pass; only matches become dicts
+        mask = publications_cache['title_lc'].str.contains(category_pattern)
+        matches = publications_cache[mask]
+        titles = matches['Title'].fillna('').astype(str).tolist()
+        links = matches.get('Link')
+        urls = links.fillna('').astype(str).tolist() if links is not None else [''] * len(titles)
+        
+        # Estimate years from the PMC IDs extracted at load time (-1 when a link has none),
+        # bucketing them all with one binary search
+        pmc_ids = matches['pmc_id'].to_numpy()
+        years = np.where(
+            pmc_ids >= 0,
+            PMC_YEAR_LABELS[np.searchsorted(PMC_YEAR_BOUNDS, pmc_ids, side='right')],
+            "N/A"
+        )
+        
+        filtered_pubs = [
+            {"title": title, "url": url, "year": year}
+            for title, url, year in zip(titles, urls, years.tolist())
+        ]
         
         # Sort by year (most recent first) - handle year ranges
         def year_sort_key(pub):
@@ -756,101 +765,14 @@ async def get_category_publications(category_name: str):
         }
     
     except Exception as e:
-        import traceback
         print(f"ERROR in /api/categories/{category_name}/publications: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-class ChatRequest(BaseModel):
-    message: str
-    context: Optional[dict] = None  # Can include current brief, evidence, etc.
-
-
-@app.post("/api/chat")
-async def chat(
-    request: ChatRequest,
-    current_user: Optional[User] = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Chat endpoint for asking questions about the filtered/displayed data
-    Uses Google Gemini API with the current result context to provide relevant answers
-    Includes LangChain memory for authenticated users
-    """
-    try:
-        # Get or create chat session for authenticated users
-        session_id = None
-        conversation_history = []
-        chat_session = None
-        
-        if current_user:
-            # Import here to avoid circular dependencies
-            from database import ChatSession
-            import uuid
-            
-            # Try to get existing session or create new one
-            session_id = str(uuid.uuid4())
-            chat_session = db.query(ChatSession).filter(
-                ChatSession.user_id == current_user.id
-            ).order_by(ChatSession.created_at.desc()).first()
-            
-            if chat_session:
-                session_id = chat_session.session_id
-                conversation_history = chat_session.conversation_history or []
-            else:
-                # Create new session
-                chat_session = ChatSession(
-                    user_id=current_user.id,
-                    session_id=session_id,
-                    conversation_history=[],
-                    context={}
-                )
-                db.add(chat_session)
-                db.commit()
-        
-        # Extract context if provided
-        context_text = ""
-        publication_details = []
-        
-        if request.context:
-            if 'brief' in request.context:
-                brief = request.context['brief']
-                context_text += f"Current Research Consensus: {brief.get('consensus', '')}\n\n"
-                context_text += f"Contradictions Found: {brief.get('contradictions', '')}\n\n"
-                context_text += f"Knowledge Gaps: {brief.get('knowledge_gaps', '')}\n\n"
-                context_text += f"Confidence Level: {brief.get('confidence', 'Unknown')}\n\n"
-            
-            if 'evidence' in request.context:
-                publication_details = request.context['evidence']
-                context_text += f"\nSupporting Evidence ({len(publication_details)} publications):\n"
-                for i, ev in enumerate(publication_details[:10], 1):
-                    title = ev.get('title', 'Untitled')
-                    year = ev.get('year', 'N/A')
-                    context_text += f"{i}. {title} ({year})\n"
-        
-        # Use Google Gemini API to generate a response
-        import google.generativeai as genai
-        import os
-        
-        api_key = os.getenv("GOOGLE_API_KEY")  # Use same env var as analyst
-        if not api_key:
-            print("WARNING: No GOOGLE_API_KEY found, using template responses")
-            return generate_template_response(request.message, request.context)
-        
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')  # Use same model as analyst
-        
-        # Build conversation history for context
-        history_context = ""
-        if conversation_history:
-            history_context = "\n\nPrevious Conversation:\n"
-            for msg in conversation_history[-5:]:  # Last 5 messages for context
-                role = msg.get('role', 'user')
-                content = msg.get('content', '')
-                history_context += f"{role.capitalize()}: {content}\n"
-        
-        # Build the prompt for Gemini
-        system_context = """You are an expert NASA Space Biology research assistant with deep knowledge of spaceflight biology, microgravity effects, radiation biology, and life sciences research.
+# Static chat instructions, sent as the model's system instruction so every request shares an
+# identical prefix (eligible for the provider's prompt caching); only context, history and question vary
+CHAT_MODEL = 'gemini-2.0-flash'  # Same model as the analyst
+CHAT_INSTRUCTIONS = """You are an expert NASA Space Biology research assistant with deep knowledge of spaceflight biology, microgravity effects, radiation biology, and life sciences research.
 
 Your role is to help users understand complex research findings, interpret scientific results from space biology studies, and provide insights based on the evidence.
 
@@ -872,37 +794,176 @@ When discussing specific research papers:
 - Explain key findings in detail
 - Discuss implications and significance
 - Mention limitations and future directions
-- Reference specific data points when available"""
+- Reference specific data points when available
+
+Answer each question helpfully and accurately based on the research context provided with it. If the context doesn't contain enough information to fully answer the question, acknowledge this and provide what insights you can."""
+
+# Gemini configured and the chat model built once per process, so every request reuses the
+# SDK's client connection (None without GOOGLE_API_KEY -> template responses)
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # Use same env var as analyst
+genai = None
+chat_model = None
+if GOOGLE_API_KEY:
+    import google.generativeai as genai
+    genai.configure(api_key=GOOGLE_API_KEY)
+    chat_model = genai.GenerativeModel(CHAT_MODEL, system_instruction=CHAT_INSTRUCTIONS)
+
+# Answers generated by /api/chat, reused for repeated or paraphrased questions in the same scope
+chat_cache = ChatResponseCache()
 
-        full_prompt = f"""{system_context}
 
-{context_text}
+class ChatRequest(BaseModel):
+    message: str
+    context: Optional[dict] = None  # Can include current brief, evidence, etc.
+
+
+def get_or_create_chat_session(db: Session, user: User):
+    """Active chat session for a user by primary key, creating one if none exists"""
+    # Try to get existing session or create new one
+    chat_session = None
+    if user.active_chat_session_id is not None:
+        chat_session = db.get(ChatSession, user.active_chat_session_id)
+    
+    if chat_session is None:
+        # Users from before active_chat_session_id existed: fall back to their latest session once
+        chat_session = db.query(ChatSession).filter(
+            ChatSession.user_id == user.id
+        ).order_by(ChatSession.created_at.desc()).first()
+    
+    if not chat_session:
+        # Create new session
+        chat_session = ChatSession(
+            user_id=user.id,
+            session_id=str(uuid.uuid4()),  # only generated when a session is actually inserted
+            conversation_history=[],
+            context={}
+        )
+        db.add(chat_session)
+        db.flush()  # Assigns the primary key
+    
+    if user.active_chat_session_id != chat_session.id:
+        user.active_chat_session_id = chat_session.id
+        db.commit()
+        db.refresh(chat_session)  # Load it here so the caller doesn't lazy-load on the event loop
+    
+    return chat_session
+
+
+def build_chat_prompt(message: str, context: Optional[dict], conversation_history: List[dict]) -> Tuple[str, str]:
+    """Gemini prompt for a chat message, plus the history part of it (which also scopes the answer cache)"""
+    # Extract context if provided
+    context_text = ""
+    
+    if context:
+        if 'brief' in context:
+            brief = context['brief']
+            context_text += f"Current Research Consensus: {brief.get('consensus', '')}\n\n"
+            context_text += f"Contradictions Found: {brief.get('contradictions', '')}\n\n"
+            context_text += f"Knowledge Gaps: {brief.get('knowledge_gaps', '')}\n\n"
+            context_text += f"Confidence Level: {brief.get('confidence', 'Unknown')}\n\n"
+        
+        if 'evidence' in context:
+            publication_details = context['evidence']
+            context_text += f"\nSupporting Evidence ({len(publication_details)} publications):\n"
+            for i, ev in enumerate(publication_details[:10], 1):
+                title = ev.get('title', 'Untitled')
+                year = ev.get('year', 'N/A')
+                context_text += f"{i}. {title} ({year})\n"
+    
+    # Build conversation history for context
+    history_context = ""
+    if conversation_history:
+        history_context = "\n\nPrevious Conversation:\n"
+        for msg in conversation_history[-5:]:  # Last 5 messages for context
+            role = msg.get('role', 'user')
+            content = msg.get('content', '')
+            history_context += f"{role.capitalize()}: {content}\n"
+    
+    # Only the per-request parts go in the prompt; the static instructions are the
+    # model's system instruction, an identical prefix on every call
+    prompt = f"""{context_text}
 {history_context}
 
-User Question: {request.message}
+User Question: {message}"""
+    return prompt, history_context
 
-Please provide a helpful, accurate answer based on the research context above. If the context doesn't contain enough information to fully answer the question, acknowledge this and provide what insights you can."""
 
-        # Call Gemini API
-        response = model.generate_content(full_prompt)
+async def answer_chat(cache_key: bytes, scope: bytes, message: str, prompt: str) -> str:
+    """Answer after an exact cache miss: a cached paraphrase if there is one, otherwise Gemini"""
+    embedding = await embed_message(message)
+    response_text = chat_cache.find_similar(cache_key, scope, embedding)
+    if response_text is None:
+        response = await chat_model.generate_content_async(prompt)
         response_text = response.text
+        chat_cache.set(cache_key, scope, embedding, response_text)
+    return response_text
+
+
+def save_chat_turn(chat_session_id: int, messages: List[dict], context: dict):
+    """
+    Append one chat turn to the stored history.
+    Runs as a background task after the response is sent, so it opens its own session.
+    """
+    db = SessionLocal()
+    try:
+        # Append only this turn's messages instead of rewriting the stored history
+        append_chat_turns(db, chat_session_id, messages, context)
+        db.commit()
+    finally:
+        db.close()
+
+
+@app.post("/api/chat")
+async def chat(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Optional[User] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Chat endpoint for asking questions about the filtered/displayed data
+    Uses Google Gemini API with the current result context to provide relevant answers
+    Includes LangChain memory for authenticated users
+    """
+    try:
+        # Get or create chat session for authenticated users
+        conversation_history = []
+        chat_session = None
         
-        # Save conversation to memory for authenticated users
+        if current_user:
+            # Blocking DB I/O runs on a worker thread
+            chat_session = await asyncio.to_thread(get_or_create_chat_session, db, current_user)
+            conversation_history = chat_session.conversation_history or []
+        
+        # Use Google Gemini API to generate a response
+        if chat_model is None:
+            print("WARNING: No GOOGLE_API_KEY found, using template responses")
+            return generate_template_response(request.message, request.context)
+        
+        prompt, history_context = build_chat_prompt(request.message, request.context, conversation_history)
+        
+        # Call Gemini API, unless the same question (or a close paraphrase) was already
+        # answered for this result context and conversation history
+        scope = chat_scope_key(request.context, history_context)
+        cache_key = chat_cache_key(request.message, scope)
+        response_text = chat_cache.get(cache_key)
+        if response_text is None:
+            # Identical questions arriving together share one lookup and model call
+            response_text = await asyncio.shield(chat_cache.single_flight(
+                cache_key, lambda: answer_chat(cache_key, scope, request.message, prompt)
+            ))
+        
+        # Save conversation to memory for authenticated users, after the response is sent
         if current_user and chat_session:
-            # Append new messages to history
-            conversation_history.append({
-                "role": "user",
-                "content": request.message
-            })
-            conversation_history.append({
-                "role": "assistant",
-                "content": response_text
-            })
-            
-            # Update session in database
-            chat_session.conversation_history = conversation_history
-            chat_session.context = request.context or {}
-            db.commit()
+            background_tasks.add_task(
+                save_chat_turn,
+                chat_session.id,
+                [
+                    {"role": "user", "content": request.message},
+                    {"role": "assistant", "content": response_text}
+                ],
+                request.context or {}
+            )
         
         return {
             "success": True,
@@ -911,12 +972,100 @@ Please provide a helpful, accurate answer based on the research context above. I
         }
     
     except Exception as e:
-        import traceback
         print(f"ERROR in /api/chat: {traceback.format_exc()}")
         # Fallback to template responses on error
         return generate_template_response(request.message, request.context)
 
 
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: Optional[User] = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Streaming variant of /api/chat: Server-Sent Events carrying the answer as Gemini writes it
+    
+    Frames are {'type': 'token', 'text': ...} pieces of the answer, then {'type': 'done'}.
+    Cached and template answers arrive as a single token frame. POST, since the result
+    context is too large for a query string; read it with fetch rather than EventSource.
+    """
+    chat_session = None
+    conversation_history = []
+    if current_user:
+        # Blocking DB I/O runs on a worker thread
+        chat_session = await asyncio.to_thread(get_or_create_chat_session, db, current_user)
+        conversation_history = chat_session.conversation_history or []
+    
+    answer = []  # The finished answer, once generate() completes; partial answers are not saved
+    
+    async def generate():
+        streamed = False
+        try:
+            if chat_model is None:
+                print("WARNING: No GOOGLE_API_KEY found, using template responses")
+                yield _sse({'type': 'token', 'text': generate_template_response(request.message, request.context)['response']})
+                yield _SSE_DONE
+                return
+            
+            prompt, history_context = build_chat_prompt(request.message, request.context, conversation_history)
+            scope = chat_scope_key(request.context, history_context)
+            cache_key = chat_cache_key(request.message, scope)
+            
+            # Same cache as /api/chat: exact match, then a close paraphrase in the same scope
+            response_text = chat_cache.get(cache_key)
+            if response_text is None:
+                embedding = await embed_message(request.message)
+                response_text = chat_cache.find_similar(cache_key, scope, embedding)
+            
+            if response_text is not None:
+                yield _sse({'type': 'token', 'text': response_text})
+                streamed = True
+            else:
+                pieces = []
+                response = await chat_model.generate_content_async(prompt, stream=True)
+                async for chunk in response:
+                    try:
+                        text = chunk.text
+                    except ValueError:  # Chunk without text parts (e.g. safety or finish metadata)
+                        continue
+                    pieces.append(text)
+                    yield _sse({'type': 'token', 'text': text})
+                    streamed = True
+                if not pieces:
+                    raise ValueError("Gemini returned no text")
+                response_text = "".join(pieces)
+                chat_cache.set(cache_key, scope, embedding, response_text)
+            
+            answer.append(response_text)
+        
+        except Exception as e:
+            print(f"ERROR in /api/chat/stream: {traceback.format_exc()}")
+            if streamed:
+                yield _sse({'type': 'error', 'message': f'Stream error: {str(e)}'})
+            else:
+                # Nothing sent yet: fall back to template responses, as /api/chat does
+                yield _sse({'type': 'token', 'text': generate_template_response(request.message, request.context)['response']})
+        
+        yield _SSE_DONE
+    
+    def save_answer():
+        # Save conversation to memory for authenticated users, after the stream ends
+        if chat_session and answer:
+            save_chat_turn(
+                chat_session.id,
+                [
+                    {"role": "user", "content": request.message},
+                    {"role": "assistant", "content": answer[0]}
+                ],
+                request.context or {}
+            )
+    
+    return EventSourceResponse(
+        generate(), ping=SSE_HEARTBEAT_INTERVAL, sep="\n", background=BackgroundTask(save_answer)
+    )
+
+
 def generate_template_response(message: str, context: Optional[dict] = None):
     """Fallback template-based responses when API is unavailable"""
     question = message.lower()
@@ -958,26 +1107,15 @@ async def metrics_stream():
     async def generate():
         try:
             while True:
-                # Send performance update
-                data = {
-                    "type": "performance_update",
-                    "timestamp": "2025-10-05T12:00:00Z",
-                    "query_time_ms": 41,
-                    "cache_hit_rate": 85.5
-                }
-                yield f"data: {json.dumps(data)}\n\n"
+                # Send performance update, pre-framed so EventSourceResponse passes the bytes through
+                yield _sse({**PERFORMANCE_UPDATE, "chat_cache": chat_cache.stats()})
                 await asyncio.sleep(2)
         except asyncio.CancelledError:
             pass
     
-    return StreamingResponse(
-        generate(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-        }
-    )
+    # EventSourceResponse sets the no-cache/no-buffering headers, sends keep-alive pings
+    # and stops the generator when the client disconnects
+    return EventSourceResponse(generate(), ping=SSE_HEARTBEAT_INTERVAL, sep="\n")
 
 
 if __name__ == "__main__":
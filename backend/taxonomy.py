@@ -0,0 +1,64 @@
+"""
+Space biology category taxonomy shared by the category endpoints
+"""
+import re
+from typing import Dict, Tuple
+
+# Space biology categories based on common research areas, matched as title substrings
+CATEGORY_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "Microgravity Effects": ("microgravity", "weightless", "zero-g", "space flight", "spaceflight"),
+    "Radiation Biology": ("radiation", "cosmic ray", "solar particle", "ionizing", "dosimetry"),
+    "Plant Biology": ("plant", "photosynthesis", "crop", "agriculture", "botany", "seed"),
+    "Cell Biology": ("cell", "cellular", "membrane", "protein", "gene expression", "molecular"),
+    "Bone & Muscle": ("bone", "muscle", "osteo", "skeletal", "calcium", "myocyte"),
+    "Cardiovascular": ("cardiovascular", "heart", "blood", "circulation", "vascular"),
+    "Immune System": ("immune", "immunity", "lymphocyte", "antibody", "infection"),
+    "Neuroscience": ("brain", "neural", "cognitive", "neurological", "neuron"),
+    "Metabolism": ("metabol", "nutrition", "diet", "energy", "glucose"),
+    "Microbiology": ("bacteria", "microbe", "microorganism", "pathogen", "microbiome"),
+    "Development": ("development", "embryo", "growth", "differentiation", "morphology"),
+    "Countermeasures": ("countermeasure", "prevention", "exercise", "pharmaceutical", "therapy")
+}
+
+# Substring alternation per category, for matching one category against lowercased titles
+CATEGORY_REGEX: Dict[str, re.Pattern] = {
+    category: re.compile('|'.join(map(re.escape, keywords)))
+    for category, keywords in CATEGORY_KEYWORDS.items()
+}
+
+CATEGORY_ICONS: Dict[str, str] = {
+    "Microgravity Effects": "🌍",
+    "Radiation Biology": "☢️",
+    "Plant Biology": "🌱",
+    "Cell Biology": "🧬",
+    "Bone & Muscle": "💪",
+    "Cardiovascular": "❤️",
+    "Immune System": "🛡️",
+    "Neuroscience": "🧠",
+    "Metabolism": "⚡",
+    "Microbiology": "🦠",
+    "Development": "🌟",
+    "Countermeasures": "💊"
+}
+
+# Key terms counted as topics (simple approach: common space biology terms)
+KEY_TERMS: Tuple[str, ...] = (
+    "gravity", "space", "radiation", "microgravity", "weightless",
+    "plant", "cell", "bone", "muscle", "brain", "immune", "bacteria",
+    "gene", "protein", "tissue", "organism", "mouse", "rat", "human",
+    "mars", "moon", "iss", "station", "flight", "mission"
+)
+
+# Research clusters (combination of categories)
+CLUSTER_COMBOS: Tuple[Tuple[str, str], ...] = (
+    ("Microgravity Effects", "Bone & Muscle"),
+    ("Radiation Biology", "Cell Biology"),
+    ("Plant Biology", "Microgravity Effects"),
+    ("Cardiovascular", "Countermeasures"),
+    ("Immune System", "Microbiology")
+)
+
+
+def get_category_icon(category: str) -> str:
+    """Get emoji icon for category"""
+    return CATEGORY_ICONS.get(category, "📊")
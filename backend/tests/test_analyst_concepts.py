@@ -0,0 +1,35 @@
+"""
+Regression tests for AnalystAgent.extract_concepts
+"""
+import os
+import sys
+import unittest
+
+# Same import root as main_agents
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from agents.analyst import AnalystAgent
+from agents.cartographer import CartographerAgent
+
+
+class ExtractConceptsTest(unittest.TestCase):
+    def setUp(self):
+        self.analyst = AnalystAgent(CartographerAgent())
+
+    def test_labels_biological_terms(self):
+        concepts = self.analyst.extract_concepts("Bone loss in mice under microgravity")
+        self.assertEqual(concepts['subjects'], {'mice'})
+        self.assertEqual(concepts['stressors'], {'microgravity'})
+        self.assertIn('Bone', concepts['all'])
+
+    def test_case_folding_variants_do_not_raise(self):
+        # "ſ" (long s) and "ı" (dotless i) case-fold to ASCII letters; they used to match the
+        # biological group and then miss the label lookup with a KeyError
+        for query in ("tiſſue damage", "proteın loss"):
+            with self.subTest(query=query):
+                concepts = self.analyst.extract_concepts(query)
+                self.assertEqual(concepts['all'], set())
+
+
+if __name__ == "__main__":
+    unittest.main()
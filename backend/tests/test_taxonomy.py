@@ -0,0 +1,44 @@
+"""
+Regression tests for the shared category taxonomy
+"""
+import os
+import sys
+import unittest
+
+# Same import root as main_agents
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from taxonomy import CATEGORY_ICONS, CATEGORY_KEYWORDS, CATEGORY_REGEX
+
+SAMPLE_TITLES = (
+    "bone loss in mice during spaceflight",
+    "effects of cosmic ray exposure on cellular dna repair",
+    "arabidopsis seedling growth in microgravity",
+    "cardiovascular deconditioning and exercise countermeasures",
+    "gut microbiome shifts in astronauts",
+    "immune response to infection aboard the iss",
+    "neuron morphology after zero-g exposure",
+    "glucose metabolism in rodents",
+    "a survey of mission operations",
+    "",
+)
+
+
+class CategoryTaxonomyTest(unittest.TestCase):
+    def test_tables_cover_the_same_categories(self):
+        self.assertEqual(set(CATEGORY_REGEX), set(CATEGORY_KEYWORDS))
+        self.assertEqual(set(CATEGORY_ICONS), set(CATEGORY_KEYWORDS))
+
+    def test_regex_matches_the_keyword_substrings(self):
+        # /api/categories counts with the keywords and /api/categories/{name} lists with the
+        # regex, so a category's list total must equal its card count
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            pattern = CATEGORY_REGEX[category]
+            for title in SAMPLE_TITLES:
+                with self.subTest(category=category, title=title):
+                    expected = any(keyword in title for keyword in keywords)
+                    self.assertEqual(bool(pattern.search(title)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useRef, useState } from 'react';
 import '../styles/ChatBot.css';
 
 interface ChatBotProps {
@@ -16,6 +16,7 @@ interface ChatBotProps {
 }
 
 interface ChatMessage {
+  id?: number;  // Set on streamed bot messages, so updates find them wherever they sit
   type: 'user' | 'bot';
   text: string;
   timestamp: Date;
@@ -46,9 +47,11 @@ export const ChatBot: React.FC<ChatBotProps> = ({ context, initialMessage, searc
   ]);
   const [inputValue, setInputValue] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  const [answerStarted, setAnswerStarted] = useState(false);
+  const nextMessageId = useRef(0);
 
   const sendMessage = async () => {
-    if (!inputValue.trim()) return;
+    if (!inputValue.trim() || isLoading) return;
 
     const userMessage: ChatMessage = {
       type: 'user',
@@ -59,9 +62,11 @@ export const ChatBot: React.FC<ChatBotProps> = ({ context, initialMessage, searc
     setMessages(prev => [...prev, userMessage]);
     setInputValue('');
     setIsLoading(true);
+    setAnswerStarted(false);
 
     try {
-      const response = await fetch(`${API_URL}/api/chat`, {
+      // Streamed as Server-Sent Events: token frames with pieces of the answer, then done
+      const response = await fetch(`${API_URL}/api/chat/stream`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -72,15 +77,51 @@ export const ChatBot: React.FC<ChatBotProps> = ({ context, initialMessage, searc
         })
       });
 
-      const data = await response.json();
-
-      const botMessage: ChatMessage = {
-        type: 'bot',
-        text: data.response || "I'm sorry, I couldn't process that request.",
-        timestamp: new Date()
+      if (!response.ok || !response.body) {
+        throw new Error(`Chat request failed: ${response.status}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let answer = '';
+      let started = false;
+      const botId = nextMessageId.current++;
+
+      // Show the answer as it arrives, growing one bot message; input stays
+      // disabled until the stream ends, only the typing indicator goes away
+      const showAnswer = (text: string) => {
+        const botMessage: ChatMessage = { id: botId, type: 'bot', text, timestamp: new Date() };
+        if (!started) {
+          started = true;
+          setAnswerStarted(true);
+          setMessages(prev => [...prev, botMessage]);
+        } else {
+          setMessages(prev => prev.map(message => (message.id === botId ? botMessage : message)));
+        }
       };
 
-      setMessages(prev => [...prev, botMessage]);
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        const frames = buffer.split('\n\n');
+        buffer = frames.pop() || '';
+        for (const frame of frames) {
+          if (!frame.startsWith('data: ')) continue;  // keep-alive pings
+          const event = JSON.parse(frame.slice(6));
+          if (event.type === 'token') {
+            answer += event.text;
+            showAnswer(answer);
+          } else if (event.type === 'error') {
+            console.error('Chat stream error:', event.message);
+          }
+        }
+      }
+
+      if (!answer) {
+        showAnswer("I'm sorry, I couldn't process that request.");
+      }
     } catch (error) {
       console.error('Chat error:', error);
       const errorMessage: ChatMessage = {
@@ -158,7 +199,7 @@ export const ChatBot: React.FC<ChatBotProps> = ({ context, initialMessage, searc
                 </div>
               </div>
             ))}
-            {isLoading && (
+            {isLoading && !answerStarted && (
               <div className="chat-message bot">
                 <div className="message-avatar">✨</div>
                 <div className="message-content">
@@ -9,12 +9,16 @@ from langchain_community.document_loaders import WebBaseLoader
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.pydantic_v1 import BaseModel, Field
 from langchain_openai import ChatOpenAI
-from langchain.output_parsers import PydanticOutputParser
+from langchain.chains.openai_functions import create_structured_output_runnable
 from neo4j import GraphDatabase
+import asyncio
+import hashlib
+import json
 import os
+import sqlite3
 import time
 from dotenv import load_dotenv
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 # Load environment variables
 load_dotenv()
@@ -37,6 +41,119 @@ class PublicationInfo(BaseModel):
     )
 
 
+# Writes a publication with all of its related nodes and relationships in one statement.
+# FOREACH (rather than UNWIND) keeps the publication row alive when a list is empty.
+# Findings are keyed by (publication_title, index), so re-ingesting a paper updates them in place;
+# the final clause removes findings left over from a longer or pre-key extraction.
+INGEST_PUBLICATION_CYPHER = """
+MERGE (p:Publication {title: $title, url: $url})
+FOREACH (subject IN $subjects |
+    MERGE (s:Subject {name: subject})
+    MERGE (p)-[:STUDIES]->(s))
+FOREACH (stressor IN $stressors |
+    MERGE (st:Stressor {name: stressor})
+    MERGE (p)-[:APPLIES]->(st))
+FOREACH (gene IN $genes |
+    MERGE (g:GeneProtein {name: gene})
+    MERGE (p)-[:MENTIONS]->(g))
+FOREACH (finding IN $findings |
+    MERGE (f:Finding {publication_title: $title, index: finding.index})
+    SET f.text = finding.text
+    MERGE (p)-[:REPORTS]->(f))
+WITH p
+OPTIONAL MATCH (p)-[:REPORTS]->(stale:Finding)
+WHERE stale.publication_title IS NULL OR stale.index >= size($findings)
+DETACH DELETE stale
+"""
+
+# Papers scraped and extracted at the same time
+INGEST_CONCURRENCY = 8
+# Upper bound on LLM extraction calls started per second
+LLM_REQUESTS_PER_SECOND = 2
+
+
+class RateLimiter:
+    """Spaces out calls so that at most `rate` start per second."""
+    
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+    
+    async def wait(self):
+        """Wait for the next free start slot."""
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Scraped pages and their extractions, reused by later runs while the page is unchanged
+INGEST_CACHE_PATH = os.path.join(os.path.dirname(__file__), '.cache', 'ingest.sqlite3')
+INGEST_CACHE_TTL = 30 * 24 * 3600  # seconds
+
+
+class IngestCache:
+    """
+    URL-keyed cache of page validators (ETag/Last-Modified), a SHA-256 of the scraped text
+    and the extracted PublicationInfo. Entries are loaded into memory at start, so tasks can
+    read them freely; only the single writer in ingest_and_graph() stores new ones.
+    """
+    
+    def __init__(self, path: str = INGEST_CACHE_PATH, ttl: float = INGEST_CACHE_TTL):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                text_hash TEXT NOT NULL,
+                extracted TEXT NOT NULL,
+                saved_at REAL NOT NULL
+            )
+        """)
+        # Drop expired entries so they are scraped and extracted again
+        self.conn.execute("DELETE FROM pages WHERE saved_at < ?", (time.time() - ttl,))
+        self.conn.commit()
+        
+        self.entries: Dict[str, dict] = {
+            url: {"validators": (etag, last_modified), "hash": text_hash, "extracted": json.loads(extracted)}
+            for url, etag, last_modified, text_hash, extracted in self.conn.execute(
+                "SELECT url, etag, last_modified, text_hash, extracted FROM pages"
+            )
+        }
+    
+    def get(self, url: str) -> Optional[dict]:
+        """Cached entry for a URL, if any."""
+        return self.entries.get(url)
+    
+    def set(self, url: str, entry: dict):
+        """Store the entry for a URL, replacing any previous one."""
+        self.entries[url] = entry
+        etag, last_modified = entry["validators"]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, entry["hash"], json.dumps(entry["extracted"]), time.time())
+        )
+        self.conn.commit()
+    
+    def close(self):
+        """Close the cache database."""
+        self.conn.close()
+
+
+def fetch_validators(loader: WebBaseLoader, url: str) -> Tuple[Optional[str], Optional[str]]:
+    """ETag and Last-Modified of a page from a HEAD request, with the loader's headers."""
+    try:
+        response = loader.session.head(url, allow_redirects=True, timeout=10)
+        return response.headers.get("ETag"), response.headers.get("Last-Modified")
+    except Exception:
+        return None, None
+
+
 class Neo4jIngester:
     """Handles connection to Neo4j and data ingestion."""
     
@@ -45,67 +162,46 @@ class Neo4jIngester:
             os.getenv("NEO4J_URI"),
             auth=(os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
         )
+        # One session for the whole ingest; naming the database skips the home-database lookup
+        self._session = self.driver.session(database=os.getenv("NEO4J_DATABASE", "neo4j"))
         
     def close(self):
-        """Close the Neo4j driver connection."""
+        """Close the Neo4j session and driver connection."""
+        self._session.close()
         self.driver.close()
     
     def create_constraints(self):
         """Create uniqueness constraints on the graph for data integrity."""
-        with self.driver.session() as session:
-            # Ensure unique publications
-            session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (p:Publication) REQUIRE p.title IS UNIQUE")
-            # Ensure unique subjects
-            session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (s:Subject) REQUIRE s.name IS UNIQUE")
-            # Ensure unique stressors
-            session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (st:Stressor) REQUIRE st.name IS UNIQUE")
-            # Ensure unique genes/proteins
-            session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (g:GeneProtein) REQUIRE g.name IS UNIQUE")
+        session = self._session
+        # Ensure unique publications
+        session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (p:Publication) REQUIRE p.title IS UNIQUE").consume()
+        # Ensure unique subjects
+        session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (s:Subject) REQUIRE s.name IS UNIQUE").consume()
+        # Ensure unique stressors
+        session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (st:Stressor) REQUIRE st.name IS UNIQUE").consume()
+        # Ensure unique genes/proteins
+        session.run("CREATE CONSTRAINT IF NOT EXISTS FOR (g:GeneProtein) REQUIRE g.name IS UNIQUE").consume()
+        # Ensure one finding per publication and position (also indexes finding lookups)
+        session.run(
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (f:Finding) REQUIRE (f.publication_title, f.index) IS UNIQUE"
+        ).consume()
         print("✓ Database constraints created")
     
     def ingest_publication(self, title: str, url: str, info: PublicationInfo):
         """Ingest a single publication and its extracted information into the graph."""
-        with self.driver.session() as session:
-            # Create Publication Node
-            session.run(
-                "MERGE (p:Publication {title: $title, url: $url})",
-                title=title, url=url
-            )
-            
-            # Create and link Subject node
-            if info.main_subject:
-                session.run("""
-                    MATCH (p:Publication {title: $title})
-                    MERGE (s:Subject {name: $subject})
-                    MERGE (p)-[:STUDIES]->(s)
-                """, title=title, subject=info.main_subject)
-            
-            # Create and link Stressor nodes
-            for stressor in info.key_stressors:
-                session.run("""
-                    MATCH (p:Publication {title: $title})
-                    MERGE (st:Stressor {name: $stressor})
-                    MERGE (p)-[:APPLIES]->(st)
-                """, title=title, stressor=stressor)
-            
-            # Create and link GeneProtein nodes
-            for gene in info.mentioned_genes_proteins:
-                session.run("""
-                    MATCH (p:Publication {title: $title})
-                    MERGE (g:GeneProtein {name: $gene})
-                    MERGE (p)-[:MENTIONS]->(g)
-                """, title=title, gene=gene)
-            
-            # Create Finding nodes
-            for idx, finding in enumerate(info.key_findings):
-                session.run("""
-                    MATCH (p:Publication {title: $title})
-                    CREATE (f:Finding {text: $finding, index: $idx})
-                    MERGE (p)-[:REPORTS]->(f)
-                """, title=title, finding=finding, idx=idx)
+        params = {
+            "title": title,
+            "url": url,
+            "subjects": [info.main_subject] if info.main_subject else [],
+            "stressors": info.key_stressors,
+            "genes": info.mentioned_genes_proteins,
+            "findings": [{"text": finding, "index": idx} for idx, finding in enumerate(info.key_findings)]
+        }
+        # One write transaction and one round trip per publication, on the shared session
+        self._session.execute_write(lambda tx: tx.run(INGEST_PUBLICATION_CYPHER, **params).consume())
 
 
-def ingest_and_graph():
+async def ingest_and_graph():
     """Main ingestion function."""
     print("🚀 Starting NASA Space Biology Knowledge Graph Ingestion...")
     
@@ -113,20 +209,18 @@ def ingest_and_graph():
     ingester = Neo4jIngester()
     ingester.create_constraints()
     
-    # Setup LLM and Parser
-    llm = ChatOpenAI(model="gpt-4-turbo", temperature=0)
-    parser = PydanticOutputParser(pydantic_object=PublicationInfo)
+    # Setup LLM; a small model is enough for tagging, and function calling returns PublicationInfo directly
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
     
     # Create a prompt template
     prompt = ChatPromptTemplate.from_messages([
         ("system", """You are an expert at reading scientific papers and extracting key information. 
         Extract the following information from the text provided. 
-        Be precise and specific. For genes and proteins, use standard nomenclature.
-        {format_instructions}"""),
+        Be precise and specific. For genes and proteins, use standard nomenclature."""),
         ("human", "Title: {title}\n\nContent: {text}")
     ])
     
-    chain = prompt | llm | parser
+    chain = create_structured_output_runnable(PublicationInfo, llm, prompt)
     
     # Read CSV with Pandas
     csv_path = os.path.join(os.path.dirname(__file__), '../data/SB_publication_PMC.csv')
@@ -136,62 +230,94 @@ def ingest_and_graph():
         print("Please place SB_publication_PMC.csv in the data/ directory")
         return
     
-    df = pd.read_csv(csv_path)
-    print(f"📊 Found {len(df)} publications to process")
+    df = pd.read_csv(csv_path, usecols=['Title', 'Link'])
+    total = len(df)
+    print(f"📊 Found {total} publications to process")
     
     successful = 0
     failed = 0
     
-    for index, row in df.iterrows():
-        url = row['Link']
-        title = row['Title']
-        
-        print(f"\n[{index + 1}/{len(df)}] Processing: {title[:60]}...")
-        
-        try:
-            # Scrape the publication
+    # Scraping and extraction are network-bound, so papers are processed concurrently;
+    # the semaphore bounds open requests and the limiter paces calls to the LLM API
+    semaphore = asyncio.Semaphore(INGEST_CONCURRENCY)
+    llm_limiter = RateLimiter(LLM_REQUESTS_PER_SECOND)
+    cache = IngestCache()
+    
+    async def extract(index: int, url: str, title: str):
+        async with semaphore:
+            print(f"\n[{index + 1}/{total}] Processing: {title[:60]}...")
+            
             loader = WebBaseLoader(url)
-            documents = loader.load()
+            cached = cache.get(url)
+            validators = await asyncio.to_thread(fetch_validators, loader, url)
+            
+            # Unchanged page according to the server: skip scraping and extraction
+            if cached and any(validators) and cached["validators"] == validators:
+                return title, url, PublicationInfo(**cached["extracted"]), None
+            
+            # Scrape the publication
+            documents = await asyncio.to_thread(loader.load)
             
             if not documents:
                 print(f"  ⚠️  No content retrieved from {url}")
-                failed += 1
-                continue
+                return None
             
             text = documents[0].page_content
+            text_hash = hashlib.sha256(text.encode()).hexdigest()
             
-            # Extract structured information using LLM
-            response: PublicationInfo = chain.invoke({
-                "text": text[:8000],  # Limit text to avoid token limits
-                "title": title,
-                "format_instructions": parser.get_format_instructions()
-            })
+            # Same text as last time: reuse the extraction
+            if cached and cached["hash"] == text_hash:
+                response = PublicationInfo(**cached["extracted"])
+            else:
+                # Extract structured information using LLM
+                await llm_limiter.wait()
+                response: PublicationInfo = await chain.ainvoke({
+                    "text": text[:8000],  # Limit text to avoid token limits
+                    "title": title
+                })
             
-            print(f"  ✓ Extracted: Subject={response.main_subject}, "
+            entry = {"validators": validators, "hash": text_hash, "extracted": response.dict()}
+            return title, url, response, entry
+    
+    tasks = [
+        asyncio.create_task(extract(index, url, title))
+        for index, (url, title) in enumerate(zip(df['Link'].tolist(), df['Title'].tolist()))
+    ]
+    
+    # Single writer: results are ingested into Neo4j one at a time as they complete
+    for task in asyncio.as_completed(tasks):
+        try:
+            result = await task
+            if result is None:
+                failed += 1
+                continue
+            
+            title, url, response, entry = result
+            print(f"  ✓ Extracted: {title[:60]}: Subject={response.main_subject}, "
                   f"Stressors={len(response.key_stressors)}, "
                   f"Genes={len(response.mentioned_genes_proteins)}")
             
             # Ingest into Neo4j
             ingester.ingest_publication(title, url, response)
+            if entry is not None:
+                cache.set(url, entry)
             successful += 1
             
-            # Rate limiting to avoid overwhelming the API
-            time.sleep(1)
-            
         except Exception as e:
             print(f"  ❌ Error processing: {str(e)}")
             failed += 1
             continue
     
     ingester.close()
+    cache.close()
     
     print(f"\n{'='*60}")
     print(f"✅ Ingestion Complete!")
     print(f"   Successful: {successful}")
     print(f"   Failed: {failed}")
-    print(f"   Total: {len(df)}")
+    print(f"   Total: {total}")
     print(f"{'='*60}")
 
 
 if __name__ == "__main__":
-    ingest_and_graph()
+    asyncio.run(ingest_and_graph())
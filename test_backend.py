@@ -2,72 +2,102 @@
 """
 Test script to verify Project Chimera backend API
 """
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import requests
 import json
 
 API_URL = "http://localhost:8000"
 
-def test_health():
-    """Test health endpoint"""
-    print("🔍 Testing /health endpoint...")
-    response = requests.get(f"{API_URL}/health")
-    print(f"   Status: {response.status_code}")
-    print(f"   Response: {response.json()}\n")
+# One session per thread (requests.Session is not thread-safe), so each
+# worker still reuses its own pooled keep-alive connections
+_local = threading.local()
 
-def test_query():
-    """Test query endpoint"""
-    print("🔍 Testing /query endpoint...")
+def get_session():
+    """This thread's session, created on first use"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+        _local.session = session
+    return session
+
+def check_health(session):
+    """Check health endpoint, returning report lines"""
+    lines = ["🔍 Testing /health endpoint..."]
+    response = session.get(f"{API_URL}/health")
+    lines.append(f"   Status: {response.status_code}")
+    lines.append(f"   Response: {response.json()}\n")
+    return lines
+
+def check_query(session):
+    """Check query endpoint, returning report lines"""
+    lines = ["🔍 Testing /query endpoint..."]
     query_data = {
         "question": "What are the effects of microgravity on plant growth?",
         "persona": "Research Scientist"
     }
-    
-    response = requests.post(
-        f"{API_URL}/query",
-        json=query_data,
-        headers={"Content-Type": "application/json"}
-    )
-    
-    print(f"   Status: {response.status_code}")
-    
+
+    response = session.post(f"{API_URL}/query", json=query_data)
+
+    lines.append(f"   Status: {response.status_code}")
+
     if response.status_code == 200:
         data = response.json()
-        print(f"   Success: {data.get('success')}")
-        print(f"   Consensus (first 200 chars): {data.get('brief', {}).get('consensus', 'N/A')[:200]}...")
-        print(f"   Evidence count: {len(data.get('evidence', []))}")
-        print(f"   Confidence: {data.get('brief', {}).get('confidence', 'N/A')}")
+        lines.append(f"   Success: {data.get('success')}")
+        lines.append(f"   Consensus (first 200 chars): {data.get('brief', {}).get('consensus', 'N/A')[:200]}...")
+        lines.append(f"   Evidence count: {len(data.get('evidence', []))}")
+        lines.append(f"   Confidence: {data.get('brief', {}).get('confidence', 'N/A')}")
     else:
-        print(f"   Error: {response.text}")
-    print()
+        lines.append(f"   Error: {response.text}")
+    lines.append("")
+    return lines
+
+def check_categories(session):
+    """Check categories endpoint, returning report lines"""
+    lines = ["🔍 Testing /api/categories endpoint..."]
+    response = session.get(f"{API_URL}/api/categories")
+    lines.append(f"   Status: {response.status_code}")
 
-def test_categories():
-    """Test categories endpoint"""
-    print("🔍 Testing /api/categories endpoint...")
-    response = requests.get(f"{API_URL}/api/categories")
-    print(f"   Status: {response.status_code}")
-    
     if response.status_code == 200:
         data = response.json()
-        print(f"   Categories count: {len(data.get('categories', []))}")
+        lines.append(f"   Categories count: {len(data.get('categories', []))}")
         if data.get('categories'):
-            print(f"   First category: {data['categories'][0]}")
-    print()
+            lines.append(f"   First category: {data['categories'][0]}")
+    lines.append("")
+    return lines
+
+def test_health():
+    """Test health endpoint"""
+    print("\n".join(check_health(get_session())))
+
+def test_query():
+    """Test query endpoint"""
+    print("\n".join(check_query(get_session())))
+
+def test_categories():
+    """Test categories endpoint"""
+    print("\n".join(check_categories(get_session())))
 
 if __name__ == "__main__":
     print("=" * 60)
     print("PROJECT CHIMERA - Backend API Test")
     print("=" * 60)
     print()
-    
+
     try:
-        test_health()
-        test_categories()
-        test_query()
-        
+        # The checks are independent, so they run concurrently, each on its worker's
+        # own session; their report lines are printed in order once all have finished
+        checks = [check_health, check_categories, check_query]
+        with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+            reports = list(executor.map(lambda check: check(get_session()), checks))
+        for lines in reports:
+            print("\n".join(lines))
+
         print("=" * 60)
         print("✅ All tests completed!")
         print("=" * 60)
-        
+
     except requests.exceptions.ConnectionError:
         print("❌ ERROR: Could not connect to backend at", API_URL)
         print("   Make sure the backend is running on port 8000")